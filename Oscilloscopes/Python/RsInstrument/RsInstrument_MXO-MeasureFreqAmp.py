@@ -3,6 +3,8 @@
 
 This Python example shows how to use measurements on the MXO oscilloscope to the controller PC.
 The MXO arbitrary generator is used as a source signal. Please connect the 'Gen 1' output to the 'C1' input.
+The statistics of all measurements are read with one concatenated SCPI query and a single OPC sync,
+instead of one OPC-synchronised query per statistic value.
 
 Preconditions:
 - Installed RsInstrument Python module from pypi.org
@@ -14,8 +16,8 @@ Tested with:
 - RsInstrument 1.54.0
 
 Author: R&S Miloslav Macko
-Updated on 11.09.2023
-Version: v1.0
+Updated on 18.10.2026
+Version: v1.1
 
 Technical support -> https://www.rohde-schwarz.com/support
 
@@ -26,6 +28,34 @@ compiled with care. However, errors can’t be ruled out.
 
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
 from packaging import version
+from typing import NamedTuple
+from time import time
+
+# Statistic results in the order of the fields of MeasurementStatistics
+statistics_queries = ['PPEak', 'NPEak', 'AVG', 'RMS', 'STDDev']
+
+
+class MeasurementStatistics(NamedTuple):
+    max: float
+    min: float
+    mean: float
+    rms: float
+    sdev: float
+
+
+def query_statistics(mxo, measurements):
+    """Query the statistics of all measurements with one SCPI message and one OPC sync.
+    Returns a dictionary {measurement number: MeasurementStatistics}"""
+    query = ';'.join(f':MEASurement{meas}:RESult:{stat}?' for meas in measurements for stat in statistics_queries)
+    values = [float(x) for x in mxo.query_str_with_opc(query).split(';')]
+    count = len(statistics_queries)
+    return {meas: MeasurementStatistics(*values[i * count:(i + 1) * count]) for i, meas in enumerate(measurements)}
+
+
+def query_statistics_one_by_one(mxo, measurements):
+    """Same as query_statistics(), but with one OPC-synchronised query per value - for comparison only"""
+    return {meas: MeasurementStatistics(*[mxo.query_float_with_opc(f'MEASurement{meas}:RESult:{stat}?')
+                                          for stat in statistics_queries]) for meas in measurements}
 
 
 def main():
@@ -104,43 +134,25 @@ def main():
     mxo.write('MEASurement1:STATistics:ENABle ON')
     mxo.write_with_opc('SINGle')  # Perform 100 acquisitions and then stop
 
-    freq_max = mxo.query_float_with_opc('MEASurement1:RESult:PPEak?')
-    freq_min = mxo.query_float_with_opc('MEASurement1:RESult:NPEak?')
-    freq_mean = mxo.query_float_with_opc('MEASurement1:RESult:AVG?')
-    freq_rms = mxo.query_float_with_opc('MEASurement1:RESult:RMS?')
-    freq_sdev = mxo.query_float_with_opc('MEASurement1:RESult:STDDev?')
-    print(f"Frequency: "
-          f"max {freq_max:0.5f} Hz, "
-          f"min {freq_min:0.5f} Hz, "
-          f"mean {freq_mean:0.5f} Hz,"
-          f"rms {freq_rms:0.5f} Hz, "
-          f"s-dev {freq_sdev:0.5f} Hz")
-
-    amp_rms_max = mxo.query_float_with_opc('MEASurement2:RESult:PPEak?')
-    amp_rms_min = mxo.query_float_with_opc('MEASurement2:RESult:NPEak?')
-    amp_rms_mean = mxo.query_float_with_opc('MEASurement2:RESult:AVG?')
-    amp_rms_rms = mxo.query_float_with_opc('MEASurement2:RESult:RMS?')
-    amp_rms_sdev = mxo.query_float_with_opc('MEASurement2:RESult:STDDev?')
-
-    print(f"Amplitude RMS: "
-          f"max {amp_rms_max:0.5f} V, "
-          f"min {amp_rms_min:0.5f} V, "
-          f"mean {amp_rms_mean:0.5f} V,"
-          f"rms {amp_rms_rms:0.5f} V, "
-          f"s-dev {amp_rms_sdev:0.5f} V")
-
-    amp_pp_max = mxo.query_float_with_opc('MEASurement3:RESult:PPEak?')
-    amp_pp_min = mxo.query_float_with_opc('MEASurement3:RESult:NPEak?')
-    amp_pp_mean = mxo.query_float_with_opc('MEASurement3:RESult:AVG?')
-    amp_pp_rms = mxo.query_float_with_opc('MEASurement3:RESult:RMS?')
-    amp_pp_sdev = mxo.query_float_with_opc('MEASurement3:RESult:STDDev?')
-
-    print(f"Amplitude Peak-Peak: "
-          f"max {amp_pp_max:0.5f} V, "
-          f"min {amp_pp_min:0.5f} V, "
-          f"mean {amp_pp_mean:0.5f} V,"
-          f"rms {amp_pp_rms:0.5f} V, "
-          f"s-dev {amp_pp_sdev:0.5f} V")
+    # All 15 statistic values with one round trip
+    start = time()
+    stats = query_statistics(mxo, [1, 2, 3])
+    elapsed_batched = time() - start
+
+    for name, unit, meas in [('Frequency', 'Hz', 1), ('Amplitude RMS', 'V', 2), ('Amplitude Peak-Peak', 'V', 3)]:
+        print(f"{name}: "
+              f"max {stats[meas].max:0.5f} {unit}, "
+              f"min {stats[meas].min:0.5f} {unit}, "
+              f"mean {stats[meas].mean:0.5f} {unit}, "
+              f"rms {stats[meas].rms:0.5f} {unit}, "
+              f"s-dev {stats[meas].sdev:0.5f} {unit}")
+
+    # The same values with one OPC-synchronised query each, to show the saved latency
+    start = time()
+    query_statistics_one_by_one(mxo, [1, 2, 3])
+    elapsed_single = time() - start
+    print(f"\nStatistics query duration: batched {elapsed_batched * 1000:0.1f} ms, "
+          f"one by one {elapsed_single * 1000:0.1f} ms, saved {(elapsed_single - elapsed_batched) * 1000:0.1f} ms")
 
     mxo.close()
 
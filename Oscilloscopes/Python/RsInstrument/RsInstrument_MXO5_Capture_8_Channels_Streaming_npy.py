@@ -0,0 +1,126 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+This Python example shows how to export the waveforms of up to 8 channels of an MXO5
+at full record length. Instead of building a Python list per channel and writing it
+as text (see RsInstrument_MXO5_Capture_7_Channels_1Ksa.py), every REAL,32 data block
+is streamed in chunks directly into one .npy file per channel. The host memory stays
+bounded by the transfer chunk size, so records of several hundred MSa can be exported.
+The transfer rate in MB/s is reported for every channel.
+
+The files can be opened later without loading them completely into memory:
+    data = numpy.load('MXO5_CH1.npy', mmap_mode='r')
+
+Before launching the script, activate the channels you want to export and perform a
+Single acquisition on the instrument.
+
+Preconditions:
+- Installed RsInstrument Python module from pypi.org
+- Installed numpy Python module
+- Installed VISA e.g. R&S Visa 5.12.x or newer
+
+Tested with:
+- MXO5, FW: v2.2.2.1
+- Python 3.9
+- RsInstrument 1.53.0
+
+Author: R&S Customer Support
+Updated on 18.10.2026
+Version: v1.0
+
+Technical support -> https://www.rohde-schwarz.com/support
+
+Before running, please always check this script for unsuitable setting !
+This example does not claim to be complete. All information have been
+compiled with care. However, errors can’t be ruled out.
+
+"""
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+import numpy as np
+import os
+from time import time
+
+# Folder and file name prefix of the exported channel files
+output_folder = r'c:\temp'
+file_prefix = 'MXO5'
+# Number of channels to be exported (inactive channels are skipped)
+num_channels = 8
+# Transfer block size in bytes - bigger blocks give higher throughput on LAN
+chunk_size = 1000000
+# Set to True to additionally measure the list based transfer of channel 1 for comparison
+compare_with_list_transfer = True
+
+
+def get_channel_samples(mxo, channel):
+    """Return the number of float values the next CHAN<n>:DATA? query will deliver"""
+    # Header: <xstart>,<xstop>,<record length>,<values per sample>
+    header = mxo.query_str(f'CHAN{channel}:DATA:HEAD?').split(',')
+    return int(float(header[2])) * int(float(header[3]))
+
+
+def stream_channel_to_npy(mxo, channel, file_path):
+    """Stream the binary waveform of one channel into an .npy file and return the number of bytes"""
+    samples = get_channel_samples(mxo, channel)
+    # Write the .npy header first, the data block is appended to it chunk by chunk
+    with open(file_path, 'wb') as file:
+        np.lib.format.write_array_header_1_0(file, {'descr': '<f4', 'fortran_order': False, 'shape': (samples,)})
+        header_size = file.tell()
+    mxo.query_bin_block_to_file(f'CHAN{channel}:DATA?', file_path, append=True)
+    data_size = os.path.getsize(file_path) - header_size
+    if data_size != samples * 4:
+        raise Exception(f'CH{channel}: received {data_size} bytes, expected {samples * 4} bytes')
+    return data_size
+
+
+def main():
+    # Make sure you have the last version of the RsInstrument
+    RsInstrument.assert_minimum_version('1.53.0')
+    mxo = None
+    try:
+        # Adjust the VISA Resource string to fit your instrument
+        mxo = RsInstrument('TCPIP::172.23.183.17::HISLIP0::INSTR', True, False)
+        mxo.visa_timeout = 50000  # Timeout for VISA Read Operations
+        mxo.opc_timeout = 3000  # Timeout for opc-synchronised operations
+        mxo.instrument_status_checking = True  # Error check after each command
+    except Exception as ex:
+        print('Error initializing the instrument session:\n' + ex.args[0])
+        exit()
+
+    print(f'Device IDN: {mxo.idn_string}')
+
+    # Binary float format, little endian is the native byte order of the .npy files ('<f4')
+    mxo.write_str("FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst")
+    mxo.query_opc()
+    mxo.data_chunk_size = chunk_size
+
+    total_bytes = 0
+    start_all = time()
+    for channel in range(1, num_channels + 1):
+        if mxo.query_int(f'CHAN{channel}:STATe?') == 0:
+            print(f'CH{channel}: not active, skipped')
+            continue
+        file_path = os.path.join(output_folder, f'{file_prefix}_CH{channel}.npy')
+        start = time()
+        size = stream_channel_to_npy(mxo, channel, file_path)
+        elapsed = time() - start
+        total_bytes += size
+        print(f'CH{channel}: {size / 4:.0f} samples, {size / 1e6:.1f} MB in {elapsed:.3f}sec '
+              f'-> {size / 1e6 / elapsed:.1f} MB/s, saved to {file_path}')
+    elapsed_all = time() - start_all
+    print(f'Total: {total_bytes / 1e6:.1f} MB in {elapsed_all:.3f}sec -> {total_bytes / 1e6 / elapsed_all:.1f} MB/s')
+
+    if compare_with_list_transfer:
+        # Previous way: the whole waveform is converted into a Python list of floats
+        mxo.bin_float_numbers_format = BinFloatFormat.Single_4bytes
+        start = time()
+        data_list = mxo.query_bin_or_ascii_float_list('CHAN1:DATA?')
+        elapsed = time() - start
+        print(f'CH1 list transfer for comparison: {len(data_list) * 4 / 1e6:.1f} MB in {elapsed:.3f}sec '
+              f'-> {len(data_list) * 4 / 1e6 / elapsed:.1f} MB/s')
+
+    mxo.close()
+
+
+if __name__ == "__main__":
+    main()
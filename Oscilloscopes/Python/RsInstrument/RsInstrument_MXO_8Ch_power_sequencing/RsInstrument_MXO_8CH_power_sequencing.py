@@ -23,9 +23,15 @@ Live mode with 8 channels:
 Live mode with 6 channels:
     python RsInstrument_MXO_8CH_power_sequencing.py --mode live --channels 6
 
+The settings of the layout, the reference curves and the measurements are collected as data and
+sent by the ScpiSetupCompiler as few concatenated SCPI messages with one OPC sync at the end.
+Settings that already have the requested value are not sent again.
+The reference files are synchronized with a local manifest of SHA-256 hashes per instrument (serial number):
+only new or changed files are uploaded, unchanged files need no query at all.
+
 Author: Christian Wicke (R&S)
-Updated on 28.05.2025
-Version: v1.0
+Updated on 18.10.2026
+Version: v1.1
 
 Technical support -> https://www.rohde-schwarz.com/support
 
@@ -33,17 +39,189 @@ Before running, please check this script for suitable settings and adjust the VI
 """
 
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
-import os, sys, argparse
+import os, sys, argparse, json, hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import time
+
+# Local manifest with the hashes of the files already uploaded, per instrument
+MANIFEST_FILE = os.path.join(os.path.expanduser('~'), 'RsInstrument_MXO_file_manifest.json')
+
+class ScpiSetupCompiler:
+    """Collects SCPI setting commands and sends them in as few concatenated messages as possible, followed
+    by one OPC sync. The command order is preserved. Settings already applied with the same value are skipped."""
+    # Commands that change many settings at once, the cache of the applied values is cleared after them
+    STATE_CHANGING = ('*RST', '*RCL', 'SYST:PRES', 'SYSTEM:PRES', ':OPEN', ':REST', ':LOAD', 'RECALL')
+
+    def __init__(self, mxo, max_message_length=4000):
+        self.mxo = mxo
+        self.max_message_length = max_message_length
+        self.applied = {}  # Last applied value per command header and selector
+        self.pending = []
+
+    @staticmethod
+    def cache_key(header, value):
+        """Header plus the leading selector argument, e.g. DISPlay:COLor:SIGNal:COLor R1,<color> -> key (header, R1),
+        value <color>. Commands with a single argument are keyed by the header alone."""
+        if ',' in value:
+            selector, _, value = value.partition(',')
+            return (header.upper(), selector.strip().upper()), value.strip()
+        return (header.upper(), None), value
+
+    def invalidate(self):
+        """Forget the applied values, e.g. after a reset outside of the compiler"""
+        self.applied = {}
+
+    def add(self, *commands):
+        self.pending.extend(command.strip().lstrip(':') for command in commands)
+
+    def apply(self):
+        """Send all pending commands, report the number of saved round trips and the estimated saved time."""
+        requested = len(self.pending)
+        to_send = []
+        for command in self.pending:
+            header, _, value = command.partition(' ')
+            if any(pattern in header.upper() for pattern in self.STATE_CHANGING):
+                # Reset or recall: the instrument settings are unknown afterwards
+                to_send.append(command)
+                self.applied = {}
+                continue
+            # Commands without a value (e.g. REFCurve1:OPEN) are actions and always sent
+            if not value:
+                to_send.append(command)
+                continue
+            key, value = self.cache_key(header, value)
+            if self.applied.get(key) == value:
+                continue
+            to_send.append(command)
+            self.applied[key] = value
+        self.pending = []
+
+        messages = []
+        message = ''
+        for command in to_send:
+            if message and len(message) + len(command) + 2 > self.max_message_length:
+                messages.append(message)
+                message = ''
+            # Common commands (*RST) are sent without the root colon
+            command = command if command.startswith('*') else f':{command}'
+            message = f'{message};{command}' if message else command
+        if message:
+            messages.append(message)
+
+        start = time()
+        for message in messages:
+            self.mxo.write(message)
+        self.mxo.query_opc()
+        elapsed = time() - start
+        round_trips = len(messages) + 1
+        saved = requested - round_trips
+        print(f'Setup: {requested} commands requested, {len(to_send)} sent in {len(messages)} message(s) + 1 OPC sync '
+              f'in {elapsed * 1000:.0f} ms, {saved} round trips saved (~{saved * elapsed / round_trips * 1000:.0f} ms)')
+
+def file_hash(path):
+    """Returns the SHA-256 hash of the file content."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def load_manifest(instrument_key):
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE, 'r') as file:
+        return json.load(file).get(instrument_key, {})
+
+def save_manifest(instrument_key, manifest):
+    manifests = {}
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r') as file:
+            manifests = json.load(file)
+    manifests[instrument_key] = manifest
+    with open(MANIFEST_FILE, 'w') as file:
+        json.dump(manifests, file, indent=2)
+
+def sync_files_to_scope(mxo, files, scope_dir, parallel_sessions=1, verify_existence=False):
+    """Uploads the files {local path: path relative to scope_dir} that are new or changed since the last upload
+    to this instrument. With parallel_sessions > 1, additional sessions are opened to upload files concurrently
+    (possible e.g. with HiSLIP). With verify_existence=True, files with unchanged hash are checked with file_exists."""
+    instrument_key = f'{mxo.full_instrument_model_name} {mxo.instrument_serial_number}'
+    manifest = load_manifest(instrument_key)
+    uploads = []
+    for local_path, relative_path in files.items():
+        scope_path = f"{scope_dir.rstrip('/')}/{relative_path}"
+        content_hash = file_hash(local_path)
+        if manifest.get(scope_path) == content_hash and (not verify_existence or mxo.file_exists(scope_path)):
+            continue
+        uploads.append((local_path, scope_path, content_hash))
+    if not uploads:
+        print('All files are up to date on the scope.')
+        return
+
+    # Create the sub-folders on the scope
+    for folder in sorted({path.rsplit('/', 1)[0] for _, path, _ in uploads}):
+        try:
+            mxo.write_with_opc(f"MMEMory:MDIRectory '{folder}'")
+        except StatusException:
+            pass  # The folder already exists
+
+    sessions = [mxo] + [RsInstrument(mxo.resource_name, id_query=False, reset=False, options="SelectVisa='rs'")
+                        for _ in range(min(parallel_sessions, len(uploads)) - 1)]
+    free_sessions = list(sessions)
+
+    def upload(item):
+        local_path, scope_path, _ = item
+        session = free_sessions.pop()
+        try:
+            print(f"Copying {os.path.basename(local_path)} to scope...")
+            session.send_file_from_pc_to_instrument(local_path, scope_path)
+        finally:
+            free_sessions.append(session)
+        return item
+
+    start = time()
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+            futures = [executor.submit(upload, item) for item in uploads]
+            # Every successful upload is recorded, also if another one fails
+            for future in as_completed(futures):
+                try:
+                    _, scope_path, content_hash = future.result()
+                    manifest[scope_path] = content_hash
+                except Exception as ex:
+                    failed.append(ex)
+    finally:
+        save_manifest(instrument_key, manifest)
+        for session in sessions[1:]:
+            session.close()
+    print(f'Uploaded {len(uploads) - len(failed)} of {len(files)} files in {time() - start:.2f} s.')
+    if failed:
+        for ex in failed:
+            print(f'Upload failed: {ex}')
+        raise failed[0]
+
+def sync_folder_to_scope(mxo, local_dir, scope_dir, parallel_sessions=1):
+    """Synchronizes the complete local folder tree (e.g. reference curves and setups) to the scope folder."""
+    files = {}
+    for root, _, names in os.walk(local_dir):
+        for name in names:
+            local_path = os.path.join(root, name)
+            files[local_path] = os.path.relpath(local_path, local_dir).replace(os.sep, '/')
+    sync_files_to_scope(mxo, files, scope_dir, parallel_sessions)
 
 def ensure_ref_files_on_scope(mxo, ref_file_names, local_ref_dir='reference-files', scope_ref_dir='/home/instrument/userData/storage/deviceDemo/8power_seq/'):
     print('Checking for reference files on scope...')
-    for ref_file in ref_file_names:
-        scope_path = f"{scope_ref_dir}{ref_file}"
-        # Ensure reference files are on the scope
-        if not mxo.file_exists(scope_path):
-            print(f"Copying {ref_file} to scope...")
-            local_path = os.path.join(local_ref_dir, ref_file)
-            mxo.send_file_from_pc_to_instrument(local_path, scope_path)
+    files = {os.path.join(local_ref_dir, ref_file): ref_file for ref_file in ref_file_names}
+    sync_files_to_scope(mxo, files, scope_ref_dir)
+
+def refcurve_commands(refcurves_values):
+    """Returns the scale and position commands for the list of (scale, position) tuples of the reference curves."""
+    commands = []
+    for i, (scale, position) in enumerate(refcurves_values, start=1):
+        commands.append(f':REFCurve{i}:SCALe {scale}')
+        commands.append(f':REFCurve{i}:POSition {position}')
+    return commands
 
 def demo_mode(mxo: RsInstrument):
     ref_file_names = [
@@ -67,16 +245,17 @@ def demo_mode(mxo: RsInstrument):
         4291001599
     ]
 
-    mxo.write(':CHANnel1:STATe 0')
+    setup = ScpiSetupCompiler(mxo)
+    setup.add(':CHANnel1:STATe 0')
     # Set the display colors for the channels
     for i in range(1, len(display_values) + 1):
-        cmd = f':DISPlay:COLor:SIGNal:COLor R{i},{display_values[i-1]}'
-        mxo.write(cmd)
+        setup.add(f':DISPlay:COLor:SIGNal:COLor R{i},{display_values[i-1]}')
 
     for idx, ref_file in enumerate(ref_file_names, start=1):
-        mxo.write_with_opc(f":REFCurve{idx}:NAME '{scope_ref_dir}{ref_file}'")
-        mxo.write(f":REFCurve{idx}:OPEN")
-    mxo.write(':REFCurve1:RESTore')
+        setup.add(f":REFCurve{idx}:NAME '{scope_ref_dir}{ref_file}'", f":REFCurve{idx}:OPEN")
+    setup.add(':REFCurve1:RESTore')
+    # Sync here, the reference curves must be loaded before their scale and position are changed
+    setup.apply()
 
     #List of tuples with scale and position values for the reference curves
     refcurves_values = [(2,-3),
@@ -88,14 +267,10 @@ def demo_mode(mxo: RsInstrument):
                         (2,-1.5),
                         (2,-3)]
 
-    for i in range(1, len(refcurves_values) + 1):
-        scale, position = refcurves_values[i-1]
-        cmd = f':REFCurve{i}:SCALe {scale}'
-        mxo.write_with_opc(cmd)
-        cmd = f':REFCurve{i}:POSition {position}'
-        mxo.write_with_opc(cmd)
+    setup.add(*refcurve_commands(refcurves_values))
 
-    configure_layout_and_nodes(mxo,'R')
+    configure_layout_and_nodes(setup,'R')
+    setup.apply()
 
     #List of tuples with scale and position values for the reference curves
     refcurves_values = [(2,-3),
@@ -107,51 +282,50 @@ def demo_mode(mxo: RsInstrument):
                         (1,0),
                         (1,-3)]
 
-    for i in range(1, len(refcurves_values) + 1):
-        scale, position = refcurves_values[i-1]
-        cmd = f':REFCurve{i}:SCALe {scale}'
-        mxo.write_with_opc(cmd)
-        cmd = f':REFCurve{i}:POSition {position}'
-        mxo.write_with_opc(cmd)
+    # Only the changed scale and position values are sent
+    setup.add(*refcurve_commands(refcurves_values))
+    setup.apply()
 
     press_any_key_to_continue('All reference curves are set. Press any key to continue...')
 
     # Configure the delay measurements for the reference curves
-    configure_measurements(mxo,'R')
+    configure_measurements(setup,'R')
+    setup.apply()
 
 def live_measurement(mxo: RsInstrument, num_channels=8):
     mxo.write('STOP')
-    mxo.write('TIMebase:SCALe 50E-3')
-    mxo.write('TIMebase:HORizontal:POSition 150e-3')
+    setup = ScpiSetupCompiler(mxo)
+    setup.add('TIMebase:SCALe 50E-3', 'TIMebase:HORizontal:POSition 150e-3')
     for i in range(1, num_channels+1):
         # Adjust the channel scale for each channel (e.g. 2V/div)
-        mxo.write(f'CHANnel{i}:SCALe 2')
-        mxo.write(f'CHANnel{i}:STATe ON')
+        setup.add(f'CHANnel{i}:SCALe 2', f'CHANnel{i}:STATe ON')
 
-    mxo.write('TRIGger:MODE NORMal')
-    mxo.write('TRIGger:MEVents:MODE SINGle')
-    mxo.write('TRIGger:EVENt1:SOURce C1')
-    mxo.write('TRIGger:EVENt1:TYPE EDGE')
-    mxo.write('TRIGger:EVENt1:EDGE:SLOPe POSitive')
-    # Adjust the trigger level to measurement setup (e.g. 3.5V)
-    mxo.write('TRIGger:EVENt1:LEVel1:VALue 3.5')
+    setup.add('TRIGger:MODE NORMal',
+              'TRIGger:MEVents:MODE SINGle',
+              'TRIGger:EVENt1:SOURce C1',
+              'TRIGger:EVENt1:TYPE EDGE',
+              'TRIGger:EVENt1:EDGE:SLOPe POSitive',
+              # Adjust the trigger level to measurement setup (e.g. 3.5V)
+              'TRIGger:EVENt1:LEVel1:VALue 3.5')
 
-    configure_layout_and_nodes(mxo, 'C', num_channels)
+    configure_layout_and_nodes(setup, 'C', num_channels)
+    setup.apply()
 
     # Wait for the trigger event to conduct measurements
     mxo.write('SINGle')
     press_any_key_to_continue('Once triggered, press any key to continue...')
     # Configure the delay measurements for the channels
-    configure_measurements(mxo, 'C', num_channels)
+    configure_measurements(setup, 'C', num_channels)
+    setup.apply()
 
-def configure_layout_and_nodes(mxo, signal_prefix='R', num_channels=8):
-    """Configures the layout and nodes on the oscilloscope for the specified channels. Sets the signal sources, layout parameters, and node types."""
+def configure_layout_and_nodes(setup, signal_prefix='R', num_channels=8):
+    """Configures the layout and nodes on the oscilloscope for the specified channels. Sets the signal sources, layout parameters, and node types. The commands are added to the ScpiSetupCompiler."""
     for i in range(2, num_channels + 1):
-        mxo.write(f'LAYout:DIAGram{i}:ENABle 1')
-        mxo.write(f'LAYout:DIAGram{i}:SOURce {signal_prefix}{i}')
+        setup.add(f'LAYout:DIAGram{i}:ENABle 1')
+        setup.add(f'LAYout:DIAGram{i}:SOURce {signal_prefix}{i}')
 
     for i in range(1, num_channels):
-        mxo.write(f'LAYout:NODE{i}:ENAB 1')
+        setup.add(f'LAYout:NODE{i}:ENAB 1')
 
     node_children = {
         7: [('DIAGRAM', 7), ('DIAGRAM', 8)],
@@ -164,27 +338,27 @@ def configure_layout_and_nodes(mxo, signal_prefix='R', num_channels=8):
     }
     for node, children in node_children.items():
         for idx, (ctype, cid) in enumerate(children, start=1):
-            mxo.write(f'LAYout:NODE{node}:CHILdren{idx}:CONTent:TYPE {ctype}')
-            mxo.write(f'LAYout:NODE{node}:CHILdren{idx}:CONTent:ID {cid}')
-        mxo.write(f'LAYout:NODE{node}:STYPe VERTICAL')
-
-def configure_measurements(mxo, signal_prefix='R', num_channels=8):
-    """Configures the measurements on the oscilloscope for the specified channels. Sets the signal sources, measurement types (e.g. DELay), reference levels, and layout parameters for the measurement display."""
-    mxo.write(':DISPlay:DIAGram:GRID 0')
-    mxo.write(':DISPlay:DIAGram:CROSshair 0')
+            setup.add(f'LAYout:NODE{node}:CHILdren{idx}:CONTent:TYPE {ctype}')
+            setup.add(f'LAYout:NODE{node}:CHILdren{idx}:CONTent:ID {cid}')
+        setup.add(f'LAYout:NODE{node}:STYPe VERTICAL')
+
+def configure_measurements(setup, signal_prefix='R', num_channels=8):
+    """Configures the measurements on the oscilloscope for the specified channels. Sets the signal sources, measurement types (e.g. DELay), reference levels, and layout parameters for the measurement display. The commands are added to the ScpiSetupCompiler."""
+    setup.add(':DISPlay:DIAGram:GRID 0')
+    setup.add(':DISPlay:DIAGram:CROSshair 0')
     for i in range(1, num_channels):
-        mxo.write(f'MEASurement{i}:SOURce {signal_prefix}{i}')
-        mxo.write(f'MEASurement{i}:SSRC {signal_prefix}{i+1}')
+        setup.add(f'MEASurement{i}:SOURce {signal_prefix}{i}')
+        setup.add(f'MEASurement{i}:SSRC {signal_prefix}{i+1}')
     for i in range(1, num_channels):
-        mxo.write(f'MEASurement{i}:MAIN DELay')
-    mxo.write('LAYout:NODE1:STYPe HORIZONTAL')
-    mxo.write('LAYout:NODE1:RATio 0.83')
+        setup.add(f'MEASurement{i}:MAIN DELay')
+    setup.add('LAYout:NODE1:STYPe HORIZONTAL')
+    setup.add('LAYout:NODE1:RATio 0.83')
     for i, middle in enumerate([65, 90], start=1):
-        mxo.write(f'REFLevel{i}:RELative:MODE USER')
-        mxo.write(f'REFLevel{i}:RELative:MIDDle {middle}')
+        setup.add(f'REFLevel{i}:RELative:MODE USER')
+        setup.add(f'REFLevel{i}:RELative:MIDDle {middle}')
     measurements = [(4, 2, 2), (5, 1, 2)]
     for meas, ref, level in measurements:
-        mxo.write(f'MEASurement{meas}:REFLevel{ref}:REFerence {level}')
+        setup.add(f'MEASurement{meas}:REFLevel{ref}:REFerence {level}')
 
 def initialize_instrument(visa_name):
     """Initializes the instrument and returns the device object."""
@@ -0,0 +1,152 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+Created on 2026/10
+
+Author: Customer Support
+Version Number: 1
+Date of last change: 2026/10/18
+Requires: R&S RTH1002, FW: v1.80.3.4
+- Installed RsInstrument Python module (see https://rsinstrument.readthedocs.io/en/latest/)
+- Installed VISA e.g. R&S Visa 5.12.x or newer
+- Can Bus Signal (CAN_L) connected to CH1 of the instrument
+- Eventually change logging path and file name before starting the script
+
+Description: Example of setting up and measuring the CAN bus Low Wire over several acquisitions.
+             In comparison to RsInstrument_RTH_CAN-Bus_Decode_and_Save.py, the frames are not read
+             one query at a time. The queries of a window of frames (start, type, ID, data) are
+             concatenated into one SCPI message, which reduces the number of round trips
+             to one per window. All frames are written into one CSV file with the columns
+             acquisition, frame, start, type, ID and data. The frames/s rate is reported
+             for every acquisition.
+
+
+General Information:
+This example does not claim to be complete. All information has been
+compiled with care. However, errors can not be ruled out.
+
+"""
+import csv
+import os
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+from time import time
+
+
+# Define variables
+LogFilePath = r'C:\RTH-Test\Data'
+LogFileName = 'can_frames.csv'
+Resource = 'TCPIP::10.205.0.11::INSTR'  # VISA identifier of the device
+Acquisitions = 10  # Number of acquisitions, the instrument is re-armed after each one
+WindowSize = 50  # Number of frames read with one SCPI message
+CompareWithSingleQueries = True  # Read the first acquisition once more frame by frame to compare the rate
+
+# Frame values read for every frame, in the order of the CSV columns
+FrameQueries = ['STARt', 'TYPE', 'ID:VALue', 'DATA']
+
+# Initiate Instrument session
+
+RsInstrument.assert_minimum_version("1.53")  # Check for RsInstrument version and stop if version is less than xx
+rth = RsInstrument(Resource, reset=True, id_query=False,
+                   options="SelectVisa='rs' , LoggingMode = Off, LoggingToConsole = False")
+print('\nHello, I am ' + rth.query('*IDN?') + '\n')
+
+
+def meas_prep():
+    """Set instrument to defined mode and operating state"""
+    rth.write('OP:MODE YT')  # Start SCOPE mode
+    rth.write('AUToscale')  # Perform autoset
+    rth.write('Timebase:SCALe 2e-3')  # Set Time Base
+    rth.write('BUS:TYPE CAN')  # Set BUS type protocol to CAN
+    rth.write('BUS:CAN:DATA:SOURce C1')  # Set BUS source to CH1
+    rth.write('BUS:CAN:Type CANL')  # Set CAN type to CAN_L
+    rth.write('BUS:FORMat DEC')  # Set Bus format to decimal
+    rth.query_opc()
+    rth.write('BUS:CAN:BITR 50000')  # Set CAN bit-rate
+    rth.write('BUS:CAN:TECHnology USER')  # Set CAN technology to User (finding own Threshold Level)
+    rth.write('CHANnel1:THReshold:FINDlevel')  # Find the right threshold level
+    rth.write('BUS:FORMat HEX')  # Set BUS decoding to desired format (BIN | OCT | DEC | HEX | ASCii)
+    rth.write('BUS:STATE ON')  # Switch on BUS decoding
+    rth.write('TRIGger:MODE SINGle')  # Set unit to single trigger mode
+    rth.query_opc()
+
+
+def path_check():
+    if not os.path.isdir(LogFilePath):
+        os.makedirs(LogFilePath)
+        print('Created destination file path.')
+
+    else:
+        print('Destination file path is already present.')
+
+
+def read_frames(first, last):
+    """Read the frames first...last with one SCPI message, return a list of [start, type, id, data] rows"""
+    query = ';'.join(f':BUS:CAN:FRAMe{n}:{value}?' for n in range(first, last + 1) for value in FrameQueries)
+    values = rth.query(query).split(';')
+    count = len(FrameQueries)
+    if len(values) != (last - first + 1) * count:
+        raise Exception(f'Frames {first}...{last}: received {len(values)} values, expected {(last - first + 1) * count}')
+    return [values[i:i + count] for i in range(0, len(values), count)]
+
+
+def read_frames_single():
+    """Previous way - one query per frame value, only used for the comparison.
+    The same values are read as in read_frames(), so both rates refer to the same amount of data"""
+    nof = int(rth.query("BUS:CAN:FCOunt?"))
+    start = time()
+    for x in range(1, nof + 1):
+        for value in FrameQueries:
+            rth.query(f"BUS:CAN:FRAMe{x}:{value}?")
+    return nof, time() - start
+
+
+def meas(writer, acquisition):
+    """Initiate and perform one acquisition, write all decoded frames with the writer"""
+    rth.write('RUN')  # Initiate Trigger
+    rth.query_opc()  # Wait for the measurement to be done
+    nof = int(rth.query("BUS:CAN:FCOunt?"))  # Get the number of decoded frames
+
+    start = time()
+    for first in range(1, nof + 1, WindowSize):
+        last = min(first + WindowSize - 1, nof)
+        for n, row in enumerate(read_frames(first, last), first):
+            writer.writerow([acquisition, n] + row)
+    elapsed = time() - start
+    rate = nof / elapsed if elapsed > 0 else 0
+    print(f'Acquisition {acquisition}: {nof} frames in {elapsed:.3f}sec -> {rate:.1f} frames/s')
+    return nof, elapsed
+
+
+def close():
+    """Close the instrument session"""
+    rth.close()
+
+
+meas_prep()
+path_check()
+
+log_file_path = os.path.join(LogFilePath, LogFileName)
+print(f'Write Frame Data into {log_file_path} now.\n')
+total_frames = 0
+total_time = 0
+# A big write buffer keeps the file access out of the frame loop
+with open(log_file_path, 'w', newline='', buffering=1024 * 1024) as file:
+    csv_writer = csv.writer(file, delimiter=';')
+    csv_writer.writerow(['Acquisition', 'Frame', 'Start', 'Type', 'ID', 'Data'])
+    for acq in range(1, Acquisitions + 1):
+        frames, duration = meas(csv_writer, acq)
+        total_frames += frames
+        total_time += duration
+
+if total_time > 0:
+    print(f'\nTotal: {total_frames} frames, {total_frames / total_time:.1f} frames/s')
+
+if CompareWithSingleQueries:
+    frames, duration = read_frames_single()
+    if duration > 0:
+        print(f'Frame by frame reading of the last acquisition: {frames / duration:.1f} frames/s')
+
+close()
+
+print('All the data has been saved now.')
@@ -4,9 +4,15 @@
 This Python example shows how to transfer waveform data (ASCII and binary format)
 + screenshot from RTH oscilloscope to the controller PC. The RTH probe compensation
 signal can be used for a simple test.
+The INT,16 waveform is kept as raw ADC samples (2 bytes per sample) in a ScaledWaveform
+object. The conversion to volts is computed with numpy only when needed. The time axis is
+described by x_start and x_increment, time_at(index) and time(start, stop) compute only the requested times.
+ScaledWaveform.from_header() also accepts the data header of the rsmxo / rsrtx packages
+(e.g. ch1.data.header.get()) to build the time axis.
 
 Preconditions:
 # - Installed RsInstrument Python module from pypi.org
+- Installed numpy Python module
 - Installed VISA e.g. R&S Visa 5.12.x or newer
 
 Tested with:
@@ -16,8 +22,8 @@ Tested with:
 - RsInstrument 1.6.0.32
 
 Author: R&S Customer Support
-Updated on 29.09.2020
-Version: v1.2
+Updated on 18.10.2026
+Version: v1.4
 
 Technical support -> https://www.rohde-schwarz.com/support
 
@@ -29,9 +35,80 @@ compiled with care. However, errors can’t be ruled out.
 
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
 import matplotlib.pyplot as plt
+import numpy as np
 from time import time
 
 
+class ScaledWaveform:
+    """Raw waveform samples together with the metadata to convert them to volts and to time.
+    volts = raw * factor + offset, time = x_start + sample index * x_increment
+    With vals_per_sample = 2 (envelope / peak detect), every sample consists of a min/max value pair."""
+
+    def __init__(self, raw, factor=1.0, offset=0.0, x_start=0.0, x_stop=None, vals_per_sample=1):
+        self.raw = np.asarray(raw)
+        self.factor = factor
+        self.offset = offset
+        self.vals_per_sample = vals_per_sample
+        self.x_start = x_start
+        self.x_stop = x_stop if x_stop is not None else x_start + self.sample_count
+
+    @classmethod
+    def from_rth_channel(cls, rth, channel=1):
+        """Fetch the INT,16 samples of the RTH channel together with the channel settings.
+        See RTH manual for details -> Transfer of Waveform Data"""
+        rth.write_str("FORMat:DATA INT,16")
+        raw = np.frombuffer(rth.query_bin_block(f"CHAN{channel}:DATA?"), dtype='<i2')
+        header = rth.query_str(f"CHAN{channel}:DATA:HEAD?").split(',')
+        scale = rth.query_float(f"CHAN{channel}:SCAL?")
+        offs = rth.query_float(f"CHAN{channel}:OFFS?")
+        pos = rth.query_float(f"CHAN{channel}:POS?")
+        vals_per_sample = int(float(header[3])) if len(header) > 3 else 1
+        return cls(raw, scale * 8 / (255 * 256), offs - pos * scale, float(header[0]), float(header[1]), vals_per_sample)
+
+    @classmethod
+    def from_header(cls, raw, header, factor=1.0, offset=0.0):
+        """Create the waveform from a data header of the rsmxo (Xstart/Xstop)
+        or rsrtx (Start/Stop) package, e.g. ch1.data.header.get()"""
+        x_start = getattr(header, 'Xstart', None)
+        if x_start is None:
+            x_start = header.Start
+        x_stop = getattr(header, 'Xstop', None)
+        if x_stop is None:
+            x_stop = header.Stop
+        raw = np.asarray(raw)
+        if len(raw) != int(header.Record_Length) * int(header.Vals_Per_Smp):
+            raise Exception(f'Waveform has {len(raw)} values, header reports {header.Record_Length} samples')
+        return cls(raw, factor, offset, x_start, x_stop, int(header.Vals_Per_Smp))
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def sample_count(self):
+        return len(self.raw) // self.vals_per_sample
+
+    @property
+    def x_increment(self):
+        return (self.x_stop - self.x_start) / self.sample_count
+
+    def volts(self, start=0, stop=None):
+        """Return the samples start...stop-1 converted to volts (float32)"""
+        volts = self.raw[start:stop].astype(np.float32)
+        volts *= np.float32(self.factor)
+        volts += np.float32(self.offset)
+        return volts
+
+    def time_at(self, index):
+        """Time of the value with the index (int or numpy array), the same time for all values of a sample.
+        Together with x_start and x_increment, this is the way to get times without a time axis array."""
+        return self.x_start + (np.asarray(index) // self.vals_per_sample) * self.x_increment
+
+    def time(self, start, stop):
+        """Return the time values of the values start...stop-1 as array, e.g. for one chunk or a plot.
+        The range is required, to allocate only the part of the time axis that is really needed."""
+        return self.time_at(np.arange(start, stop))
+
+
 def main():
     # Make sure you have the last version of the RsInstrument
     RsInstrument.assert_minimum_version('1.53.0')
@@ -68,27 +145,16 @@ def main():
     print(f'Number of sample points: {rth.query_float("ACQ:POIN?")}')
     print(f'Data capturing elapsed time: {stop - start:.3f}sec')
 
-    # get binary data
+    # get binary data - the raw ADC values are kept, the conversion to volts is done on request
     start = time()
-    rth.write_str("FORMat:DATA INT,16")
-    rth.bin_int_numbers_format = BinIntFormat.Integer16_2bytes
     rth.data_chunk_size = 100000  # transfer in blocks of 100k bytes (default)
-    data_bin = rth.query_bin_or_ascii_int_list("CHAN:DATA?")
-
-    ch1_scale = rth.query_float("CHAN1:SCAL?")
-    ch1_offs = rth.query_float("CHAN1:OFFS?")
-    ch1_pos = rth.query_float("CHAN1:POS?")
-
-    # see RTH manual for details -> Transfer of Waveform Data
-    factor = ch1_scale * 8 / (255*256)
-    offs = ch1_offs - ch1_pos * ch1_scale
-    # apply multiplication factor and offset to the raw ADC values
-    data_bin = [(x * factor + offs) for x in data_bin]
+    waveform = ScaledWaveform.from_rth_channel(rth, 1)
 
     print(f'Binary waveform transfer elapsed time: {time() - start:.3f}sec')
 
     plt.figure(1)
-    plt.plot(data_bin)
+    # The plot needs the complete time axis, it is only allocated here
+    plt.plot(waveform.time(0, len(waveform)), waveform.volts())
     plt.title('Binary waveform')
 
     # get ASCII data
@@ -0,0 +1,167 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+This Python example shows how to fetch the binary waveform of an RTO, MXO, RTA or RTH
+oscilloscope directly into a numpy array. The IEEE 488.2 definite length block is read
+chunk by chunk into a preallocated bytearray, which is then viewed as numpy array with
+the matching data type and byte order - no Python float objects are created.
+VISA returns every chunk as a new bytes object, so each chunk is copied once into the buffer.
+The buffer can be reused for the next acquisition.
+
+The script compares the transfer time and the peak host memory of:
+- the numpy buffer fetch of this example
+- the binary list transfer with query_bin_or_ascii_float_list() / query_bin_or_ascii_int_list()
+- the ASCII transfer used in the waveform transfer examples
+
+Before launching the script, perform a single acquisition on the instrument so that
+all transfer methods return the same waveform.
+
+Preconditions:
+- Installed RsInstrument Python module from pypi.org
+- Installed numpy Python module
+- Installed VISA e.g. R&S Visa 5.12.x or newer
+
+Tested with:
+- RTO, FW: v4.80.1.0
+- Python 3.9
+- RsInstrument 1.53.0
+
+Author: R&S Customer Support
+Updated on 18.10.2026
+Version: v1.0
+
+Technical support -> https://www.rohde-schwarz.com/support
+
+Before running, please always check this script for unsuitable setting !
+This example does not claim to be complete. All information have been
+compiled with care. However, errors can’t be ruled out.
+
+"""
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+import numpy as np
+import tracemalloc
+from time import time
+
+# Select the instrument family: 'RTO', 'MXO', 'RTA' or 'RTH'
+scope_type = 'RTO'
+# Number of repetitions of every transfer method, the fastest one is reported
+repetitions = 3
+
+# Data query, data format setting and the resulting binary format per instrument family
+scope_settings = {
+    'RTO': ('CHAN:DATA?', 'FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst', BinFloatFormat.Single_4bytes),
+    'MXO': ('CHAN:DATA?', 'FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst', BinFloatFormat.Single_4bytes),
+    'RTA': ('CHAN1:DATA?', 'FORMat:DATA REAL,32', BinFloatFormat.Single_4bytes_swapped),
+    'RTH': ('CHAN:DATA?', 'FORMat:DATA INT,16', BinIntFormat.Integer16_2bytes),
+}
+
+# numpy data type for every RsInstrument binary format
+numpy_dtypes = {
+    BinFloatFormat.Single_4bytes: np.dtype('<f4'),
+    BinFloatFormat.Single_4bytes_swapped: np.dtype('>f4'),
+    BinFloatFormat.Double_8bytes: np.dtype('<f8'),
+    BinFloatFormat.Double_8bytes_swapped: np.dtype('>f8'),
+    BinIntFormat.Integer16_2bytes: np.dtype('<i2'),
+    BinIntFormat.Integer16_2bytes_swapped: np.dtype('>i2'),
+    BinIntFormat.Integer32_4bytes: np.dtype('<i4'),
+    BinIntFormat.Integer32_4bytes_swapped: np.dtype('>i4'),
+}
+
+
+def query_waveform_numpy(instr, query, bin_format, buffer=None):
+    """Query a binary data block into a (reusable) bytearray and return it as numpy array view.
+    Returns the tuple (array, buffer). Pass the buffer to the next call to avoid a new allocation."""
+    dtype = numpy_dtypes[bin_format]
+    session = instr.get_session_handle()
+    # Write directly to the session, a status query in between would mix up the response
+    session.write(query)
+    # IEEE 488.2 definite length block: #<number of length digits><length><data>
+    header = session.read_bytes(2)
+    if header[0:1] != b'#' or header[1:2] == b'0':
+        raise Exception(f'Query "{query}" did not return a definite length binary block')
+    length = int(session.read_bytes(int(header[1:2])))
+    if buffer is None or len(buffer) < length:
+        buffer = bytearray(length)
+    view = memoryview(buffer)
+    position = 0
+    while position < length:
+        # VISA has no read into an existing buffer, the chunk is copied once
+        chunk = session.read_bytes(min(instr.data_chunk_size, length - position))
+        view[position:position + len(chunk)] = chunk
+        position += len(chunk)
+    session.read_bytes(1)  # Read the termination character
+    return np.frombuffer(buffer, dtype=dtype, count=length // dtype.itemsize), buffer
+
+
+def benchmark(name, function):
+    """Run the function several times, print the fastest run and the peak memory, return the last result.
+    The runs are timed without tracemalloc, which slows down every Python allocation and would penalize
+    the list transfers much more than the numpy fetch. The peak memory is measured in a separate first run,
+    which also includes the allocation of the reusable numpy buffer."""
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result = None
+    elapsed = []
+    for _ in range(repetitions):
+        start = time()
+        result = function()
+        elapsed.append(time() - start)
+    print(f'{name:<24} {len(result):>10} samples  {min(elapsed):8.3f}sec  peak memory {peak / 1e6:8.1f} MB')
+    return result
+
+
+def main():
+    # Make sure you have the last version of the RsInstrument
+    RsInstrument.assert_minimum_version('1.53.0')
+    scope = None
+    try:
+        # Adjust the VISA Resource string to fit your instrument
+        scope = RsInstrument('TCPIP::10.205.0.103::INSTR', True, False)
+        scope.visa_timeout = 20000  # Timeout for VISA Read Operations
+        scope.opc_timeout = 3000  # Timeout for opc-synchronised operations
+        scope.instrument_status_checking = True  # Error check after each command
+    except Exception as ex:
+        print('Error initializing the instrument session:\n' + ex.args[0])
+        exit()
+
+    print(f'Device IDN: {scope.idn_string}')
+    print(f'Number of sample points: {scope.query_float("ACQ:POIN?")}\n')
+    query, format_command, bin_format = scope_settings[scope_type]
+    scope.data_chunk_size = 100000  # transfer in blocks of 100k bytes (default)
+
+    # Binary transfer into numpy, the buffer is allocated once and reused for every repetition
+    scope.write_str(format_command)
+    scope.query_opc()
+    buffer = None
+
+    def fetch_numpy():
+        nonlocal buffer
+        waveform, buffer = query_waveform_numpy(scope, query, bin_format, buffer)
+        return waveform
+
+    data_numpy = benchmark('Binary -> numpy', fetch_numpy)
+
+    # Binary transfer into a Python list
+    if isinstance(bin_format, BinIntFormat):
+        scope.bin_int_numbers_format = bin_format
+        data_list = benchmark('Binary -> list', lambda: scope.query_bin_or_ascii_int_list(query))
+    else:
+        scope.bin_float_numbers_format = bin_format
+        data_list = benchmark('Binary -> list', lambda: scope.query_bin_or_ascii_float_list(query))
+
+    # ASCII transfer into a Python list
+    scope.write_str("FORM:DATA ASC")
+    scope.query_opc()
+    benchmark('ASCII -> list', lambda: scope.query_bin_or_ascii_float_list(query))
+
+    if not np.array_equal(data_numpy, np.array(data_list, dtype=data_numpy.dtype)):
+        print('Warning: numpy and list transfer returned different data')
+
+    scope.close()
+
+
+if __name__ == "__main__":
+    main()
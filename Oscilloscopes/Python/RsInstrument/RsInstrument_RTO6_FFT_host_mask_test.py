@@ -0,0 +1,240 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+This Python example shows how to evaluate FFT traces of a RTO6 oscilloscope against masks on the control PC.
+It uses the same mask definitions as RsInstrument_RTO6_FFT_CISPR-BandC.py (mask_points) and
+RsInstrument_RTO6_FFT_zone_trigger.py (zone1_points).
+- Limit masks: the lower edge of the mask polygon is interpolated in log-frequency onto the FFT frequency bins once.
+  A trace level above this edge is a violation, the margin is (mask edge - level).
+- Zone masks: the level intervals inside the polygon are calculated per bin once. A trace level inside the zone
+  is a violation, as with MTESt:SEGMent:REGion INNER. The margin is the distance to the nearest zone border.
+- The FFT traces are fetched in binary format and evaluated in batches with numpy. The worst-case margin
+  per frequency bin over all traces is saved to a CSV file.
+- The masks can still be uploaded to the instrument, all vertices of a mask are sent in one SCPI message.
+
+Preconditions:
+- Installed RsInstrument Python module from pypi.org
+- Installed numpy Python module
+- Installed VISA e.g. R&S Visa 7.2.x or newer
+
+Tested with:
+- RTO6, FW: v5.40.1.0
+- Python 3.12+
+- RsInstrument 1.82.1
+
+Author: R&S Customer Support
+Updated on 18.10.2026
+Version: v1.1
+
+RsInstrument documentation: https://rsinstrument.readthedocs.io/en/latest/
+
+Technical support -> https://www.rohde-schwarz.com/support
+
+Before running, please check this script for suitable settings and adjust the VISA Resource Name string!
+"""
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+import numpy as np
+import time
+
+
+def mask_upload_commands(name, points, source='M1'):
+    """Return one SCPI message that defines the mask with all its vertices (same commands as the single writes)"""
+    commands = [f"MTESt:ADD '{name}'",
+                f"MTESt:SOURce '{name}',{source}",
+                f"MTESt:CTYPe '{name}',USER",
+                f"MTESt:SEGMent:ADD '{name}'"]
+    for index, (x, y) in enumerate(points):
+        commands.append(f"MTESt:SEGMent:POINt:ADD '{name}',0")
+        commands.append(f"MTESt:SEGMent:POINt:X '{name}',0,{index},{x}")
+        commands.append(f"MTESt:SEGMent:POINt:Y '{name}',0,{index},{y}")
+    commands.append(f"MTESt:SEGMent:REGion '{name}',0, INNER")
+    commands.append(f"MTESt:STATe '{name}',ON")
+    return ';:'.join(commands)
+
+
+def mask_lower_edge(points, freq):
+    """Interpolate the lower edge of the closed mask polygon in log-frequency onto the frequency bins.
+    Bins outside the mask get NaN (no limit)."""
+    x = np.log10(np.array([float(p[0]) for p in points]))
+    y = np.array([float(p[1]) for p in points])
+    log_freq = np.log10(freq)
+    lower = np.full(len(freq), np.nan)
+    # Every polygon edge, including the closing edge from the last to the first point
+    for x0, y0, x1, y1 in zip(x, y, np.roll(x, -1), np.roll(y, -1)):
+        if x0 == x1:
+            continue  # Vertical edges are covered by their neighbours
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        inside = (log_freq >= x0) & (log_freq <= x1)
+        edge = y0 + (log_freq[inside] - x0) * (y1 - y0) / (x1 - x0)
+        lower[inside] = np.fmin(lower[inside], edge)
+    return lower
+
+
+def zone_intervals(points, freq):
+    """Level intervals inside the closed zone polygon per frequency bin, as two arrays (intervals x bins)
+    of the lower and upper levels. Intervals not present at a bin are NaN."""
+    x = np.log10(np.array([float(p[0]) for p in points]))
+    y = np.array([float(p[1]) for p in points])
+    log_freq = np.log10(freq)
+    crossings = []
+    for x0, y0, x1, y1 in zip(x, y, np.roll(x, -1), np.roll(y, -1)):
+        if x0 == x1:
+            continue  # Vertical edges do not cross a vertical line through a bin
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        # Half-open range, so a vertex shared by two edges is counted once
+        crossing = np.full(len(freq), np.nan)
+        inside = (log_freq >= x0) & (log_freq < x1)
+        crossing[inside] = y0 + (log_freq[inside] - x0) * (y1 - y0) / (x1 - x0)
+        crossings.append(crossing)
+    # Sorted crossings per bin (NaN at the end), every pair encloses a part of the zone
+    crossings = np.sort(np.array(crossings), axis=0)
+    return crossings[0::2][:len(crossings) // 2], crossings[1::2]
+
+
+class HostMaskTest:
+    """Worst-case margins of any number of traces against a set of masks.
+    A 'limit' mask is reduced to the lower edge of its polygon: a level above it is a violation, the margin
+    is (mask edge - level). A 'zone' mask is violated if a level is inside the polygon (as REGion INNER),
+    the margin is the distance to the nearest zone border, negative inside."""
+
+    def __init__(self, masks, freq):
+        self.freq = freq
+        self.names = list(masks)
+        limits = [mask_lower_edge(points, freq) for points, kind in masks.values() if kind == 'limit']
+        # The lowest limit of all limit masks applies per bin
+        self.limit = np.fmin.reduce(np.vstack(limits), axis=0) if limits else np.full(len(freq), np.nan)
+        self.zones = [zone_intervals(points, freq) for points, kind in masks.values() if kind == 'zone']
+        covered = ~np.isnan(self.limit)
+        for lower, upper in self.zones:
+            covered |= ~np.isnan(lower).all(axis=0)
+        # Only the bins covered by a mask are evaluated
+        self.covered = covered
+        self.worst_margin = np.full(len(freq), np.nan)
+        self.trace_count = 0
+        self.violation_count = 0
+
+    def margins(self, traces):
+        """Margins of a 2D array (traces x bins) against all masks, only for the covered bins"""
+        margins = self.limit[self.covered] - traces[:, self.covered]
+        for lower, upper in self.zones:
+            lower, upper = lower[:, None, self.covered], upper[:, None, self.covered]
+            with np.errstate(invalid='ignore'):
+                # Positive below or above the interval, negative inside, NaN for missing intervals
+                distance = np.fmax(lower - traces[:, self.covered], traces[:, self.covered] - upper)
+            margins = np.fmin(margins, np.fmin.reduce(distance, axis=0))
+        return margins
+
+    def evaluate(self, traces):
+        """Evaluate a 2D array (traces x bins), return the boolean violation flag per trace"""
+        margins = self.margins(traces)
+        self.worst_margin[self.covered] = np.fmin(self.worst_margin[self.covered], margins.min(axis=0))
+        violations = margins.min(axis=1) < 0
+        self.trace_count += len(traces)
+        self.violation_count += int(np.count_nonzero(violations))
+        return violations
+
+    def save_csv(self, file_path):
+        np.savetxt(file_path, np.column_stack((self.freq, self.limit, self.worst_margin)), delimiter=',',
+                   header='Frequency,Limit,Worst margin', comments='', fmt='%.6g')
+
+
+def main():
+    # Make sure you have the last version of the RsInstrument
+    RsInstrument.assert_minimum_version('1.82')
+    visa_resource_name = 'TCPIP::192.168.1.101::hislip0'
+    file_path_csv = r'c:\temp\Mask_Worst_Margin.csv'
+    # FFT variables for CISPR Band-C (30 MHz to 300 MHz) measurements
+    fft_vars = {'f_start': '30E+6',
+                'f_stop': '300E+6',
+                'rbw': '120E+3'}
+    mask_points = [['30E+6', '50'],
+                   ['30E+6', '40'],
+                   ['230E+6', '40'],
+                   ['230E+6', '47'],
+                   ['1E+9', '47'],
+                   ['1E+9', '47.5'],
+                   ['230E+6', '47.5'],
+                   ['230E+6', '40.5'],
+                   ['30E+6', '40.5'],
+                   ['30E+6', '50.5']]
+    zone1_points = [['95E+6', '-60'],
+                    ['95E+6', '-50'],
+                    ['105E+6', '-50'],
+                    ['105E+6', '-60']]
+    # Masks to test on the PC: name -> (points, 'limit' or 'zone')
+    # Only use masks with the same unit as the FFT magnitude (here dBuV)
+    masks = {'VAC_Radiated_QP_3M': (mask_points, 'limit')}
+    # masks['Zone1'] = (zone1_points, 'zone')  # Zone of RsInstrument_RTO6_FFT_zone_trigger.py, for an FFT magnitude in dBm
+    upload_masks = True  # Also define the masks on the instrument (all vertices in one message per mask)
+    batch_size = 100  # Number of traces evaluated together
+    trace_count = 1000  # Total number of traces
+    try:
+        # Adjust the VISA Resource string to fit your instrument
+        rto = RsInstrument(visa_resource_name, id_query=True, reset=True, options="SelectVisa='rs'")
+        rto.visa_timeout = 5000  # Timeout for VISA Read Operations
+        rto.opc_timeout = 8000  # Timeout for opc-synchronised operations
+        rto.instrument_status_checking = True  # Error check after each command
+    except Exception as ex:
+        print('Error initializing the instrument session:\n' + ex.args[0])
+        exit()
+
+    print(f'Device IDN: {rto.idn_string}')
+
+    # Reset to get a defined state
+    rto.reset()
+    rto.write('SYSTem:DISPlay:UPDate ON')
+    rto.query_opc()
+
+    # Channel1 and FFT setup as in RsInstrument_RTO6_FFT_CISPR-BandC.py, single FFT per acquisition
+    rto.write('CHAN1:SCAL 0.05')
+    rto.write('CHAN1:COUP DC')
+    rto.write('LAY:SIGNal:UNASsign C1W1')
+    rto.write("CALCulate:MATH1 'FFTmag(C1W1)'")
+    rto.write('CALCulate:MATH1:FFT:STARt ' + fft_vars['f_start'])
+    rto.write('CALCulate:MATH1:FFT:STOP ' + fft_vars['f_stop'])
+    rto.write('CALCulate:MATH1:FFT:BANDwidth:RESolution:VALue ' + fft_vars['rbw'])
+    rto.write('CALC:MATH1:FFT:MAGN:SCAL DBUV')
+    rto.write_with_opc('CALCulate:MATH1:STATe ON')
+
+    if upload_masks:
+        start = time.time()
+        for name, (points, _) in masks.items():
+            rto.write(mask_upload_commands(name, points))
+        rto.query_opc()
+        print(f'Masks uploaded in {time.time() - start:.3f} sec')
+
+    rto.write('ACQuire:COUNt 1')
+    rto.write('FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst')
+    rto.write_with_opc('RUNSingle')
+    # Header: <xstart>,<xstop>,<record length>,<values per sample>
+    header = rto.query_str('CALCulate:MATH1:DATA:HEADer?').split(',')
+    freq = np.linspace(float(header[0]), float(header[1]), int(float(header[2])))
+    mask_test = HostMaskTest(masks, freq)
+
+    batch = np.empty((batch_size, len(freq)), dtype=np.float32)
+    start = time.time()
+    done = 0
+    while done < trace_count:
+        rows = min(batch_size, trace_count - done)
+        for row in range(rows):
+            rto.write_with_opc('RUNSingle')
+            batch[row] = np.frombuffer(rto.query_bin_block('CALCulate:MATH1:DATA:VALues?'), dtype='<f4')
+        mask_test.evaluate(batch[:rows])
+        done += rows
+    elapsed = time.time() - start
+
+    print(f'{mask_test.trace_count} traces in {elapsed:.1f} sec ({mask_test.trace_count / elapsed * 60:.0f} traces/min), '
+          f'{mask_test.violation_count} traces with violations')
+    print(f'Worst-case margin: {mask_test.worst_margin[mask_test.covered].min():.2f} dB')
+    mask_test.save_csv(file_path_csv)
+    print(f'\nSaved CSV file to {file_path_csv}')
+
+    # Close the session to the instrument
+    rto.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+This Python example shows how to run a long-term radiated emissions measurement with the FFT of a RTO6
+oscilloscope. In comparison to RsInstrument_RTO6_radiated_emissions.py, the spectra are not only evaluated
+on the instrument: every FFT result is fetched in binary format (REAL,32) as soon as the acquisition is
+complete, and the max-hold trace, the average trace and the peak list are computed on the control PC with numpy.
+The completion of each acquisition is detected with the Event Status Register (*OPC sets bit 0) polled with an
+increasing wait time, instead of a tight ACQuire:AVAilable? query loop.
+The results are saved periodically to a checkpoint file, the memory usage stays constant for any run time.
+
+Preconditions:
+- Installed RsInstrument Python module from pypi.org
+- Installed numpy Python module
+- Installed VISA e.g. R&S Visa 7.2.x or newer
+
+Tested with:
+- RTO6, FW: v5.40.1.0
+- Python 3.12+
+- RsInstrument 1.82.1
+
+Author: R&S Customer Support
+Updated on 18.10.2026
+Version: v1.0
+
+RsInstrument documentation: https://rsinstrument.readthedocs.io/en/latest/
+
+Technical support -> https://www.rohde-schwarz.com/support
+
+Before running, please check this script for suitable settings and adjust the VISA Resource Name string!
+"""
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+import numpy as np
+import time
+
+
+def wait_for_operation_complete(rto, timeout, min_wait=0.01, max_wait=0.5):
+    """Wait for bit 0 (Operation Complete) of the Event Status Register.
+    The wait time between the queries is doubled up to max_wait."""
+    wait = min_wait
+    deadline = time.time() + timeout
+    while not rto.query_int('*ESR?') & 1:
+        if time.time() > deadline:
+            raise TimeoutError(f'Acquisition not complete after {timeout} s')
+        time.sleep(wait)
+        wait = min(wait * 2, max_wait)
+
+
+def find_peaks(freq, level, threshold, count):
+    """Return the list of the count highest (frequency, level) local maxima above the threshold"""
+    inner = level[1:-1]
+    is_peak = (inner > level[:-2]) & (inner >= level[2:]) & (inner > threshold)
+    indexes = np.flatnonzero(is_peak) + 1
+    indexes = indexes[np.argsort(level[indexes])[::-1][:count]]
+    return [(freq[i], level[i]) for i in indexes]
+
+
+def main():
+    # Make sure you have the last version of the RsInstrument
+    RsInstrument.assert_minimum_version('1.82')
+    visa_resource_name = 'TCPIP::192.168.1.101::hislip0'
+    fft_vars = {'f_start': '20E+6',
+                'f_stop': '450E+6',
+                'rbw': '300E+3'}
+    peak_vars = {'p_threshold': -70,
+                 'p_count': 10}
+    run_time = 4 * 3600  # Total measurement time in seconds
+    checkpoint_interval = 60  # Save the results every n seconds
+    checkpoint_file = r'c:\temp\RTO6_emissions_checkpoint.npz'
+    try:
+        # Adjust the VISA Resource string to fit your instrument
+        rto = RsInstrument(visa_resource_name, id_query=True, reset=True, options="SelectVisa='rs'")
+        rto.visa_timeout = 5000  # Timeout for VISA Read Operations
+        rto.opc_timeout = 8000  # Timeout for opc-synchronised operations
+        rto.instrument_status_checking = True  # Error check after each command
+    except Exception as ex:
+        print('Error initializing the instrument session:\n' + ex.args[0])
+        exit()
+
+    print(f'Device IDN: {rto.idn_string}')
+    print(f'Device Options: {",".join(rto.instrument_options)}\n')
+
+    # Reset to get a defined state
+    rto.reset()
+    rto.write('SYSTem:DISPlay:UPDate ON')
+    rto.query_opc()
+
+    # Channel1 setup
+    rto.write('CHAN1:COUP DC')
+    rto.write('LAY:SIGNal:UNASsign C1W1')
+
+    # FFT settings for Channel1
+    rto.write("CALCulate:MATH1 'FFTmag(C1W1)'")
+    rto.write('CALCulate:MATH1:FFT:STARt ' + fft_vars['f_start'])
+    rto.write('CALCulate:MATH1:FFT:STOP ' + fft_vars['f_stop'])
+    rto.write('CALCulate:MATH1:FFT:BANDwidth:RESolution:VALue ' + fft_vars['rbw'])
+    rto.write('CALCulate:MATH1:FFT:MAGNitude:SCALe DBM')
+    rto.write_with_opc('CALCulate:MATH1:STATe ON')
+
+    # One acquisition per RUNSingle, binary data transfer
+    rto.write('ACQuire:COUNt 1')
+    rto.write('FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst')
+    rto.query_opc()
+
+    # Frequency axis from the header: <xstart>,<xstop>,<record length>,<values per sample>
+    rto.write_with_opc('RUNSingle')
+    header = rto.query_str('CALCulate:MATH1:DATA:HEADer?').split(',')
+    freq = np.linspace(float(header[0]), float(header[1]), int(float(header[2])))
+    max_hold = np.full(len(freq), -np.inf, dtype=np.float32)
+    level_sum = np.zeros(len(freq), dtype=np.float64)
+    count = 0
+
+    def save_checkpoint():
+        average = (level_sum / count).astype(np.float32)
+        peaks = np.array(find_peaks(freq, max_hold, peak_vars['p_threshold'], peak_vars['p_count']))
+        np.savez(checkpoint_file, freq=freq, max_hold=max_hold, average=average, peaks=peaks, count=count)
+        print(f'{count} spectra processed, checkpoint saved to {checkpoint_file}')
+
+    start = time.time()
+    next_checkpoint = start + checkpoint_interval
+    try:
+        while time.time() - start < run_time:
+            # *ESR? is cleared by the query, so the bit 0 is only set by the *OPC of this acquisition
+            rto.query_int('*ESR?')
+            rto.write('RUNSingle;*OPC')
+            wait_for_operation_complete(rto, timeout=30)
+            spectrum = np.frombuffer(rto.query_bin_block('CALCulate:MATH1:DATA:VALues?'), dtype='<f4')
+            np.maximum(max_hold, spectrum, out=max_hold)
+            level_sum += spectrum
+            count += 1
+            if time.time() >= next_checkpoint:
+                save_checkpoint()
+                next_checkpoint += checkpoint_interval
+    except KeyboardInterrupt:
+        print('Measurement stopped by the user.')
+
+    if count > 0:
+        save_checkpoint()
+        print(f'Rate: {count / (time.time() - start):.1f} spectra/s')
+        print('\nPeak list (max hold):')
+        for f, level in find_peaks(freq, max_hold, peak_vars['p_threshold'], peak_vars['p_count']):
+            print(f'{f / 1e6:10.3f} MHz  {level:7.2f} dBm')
+
+    # Close the session to the instrument
+    print(rto.query_all_errors_with_codes())
+    rto.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+# GitHub examples repository path: Oscilloscopes/Python/RsInstrument
+
+This Python example shows how to find the best data_chunk_size for big binary waveform
+transfers. The waveform examples use a fixed chunk size of 100k bytes, which is not
+optimal for big records on fast interfaces like HiSLIP.
+The script transfers the waveform with several chunk sizes, prints a report (chunk size
+vs. MB/s) and stores the fastest chunk size in a small JSON profile, separately for each
+instrument model and interface (HiSLIP, VXI-11, SOCKET, USB, ...). Later runs reuse the
+stored value without probing again, unless the tuning is forced.
+
+With use_simulator = True the script starts a local socket simulator that answers
+CHAN:DATA? with a REAL,32 block, so the tuning can be tried without an instrument.
+
+Preconditions:
+- Installed RsInstrument Python module from pypi.org
+- Installed VISA e.g. R&S Visa 5.12.x or newer (not needed for the simulator)
+
+Tested with:
+- RTO, FW: v4.80.1.0
+- Python 3.9
+- RsInstrument 1.53.0
+
+Author: R&S Customer Support
+Updated on 18.10.2026
+Version: v1.0
+
+Technical support -> https://www.rohde-schwarz.com/support
+
+Before running, please always check this script for unsuitable setting !
+This example does not claim to be complete. All information have been
+compiled with care. However, errors can’t be ruled out.
+
+"""
+
+from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
+import json
+import os
+import socket
+import threading
+from time import time
+
+# Adjust the VISA Resource string to fit your instrument
+resource_string = 'TCPIP::10.205.0.103::hislip0'
+# Data query used for the tuning
+waveform_query = 'CHAN:DATA?'
+# Chunk sizes in bytes to be probed
+chunk_sizes = [10000, 100000, 500000, 1000000, 4000000, 10000000]
+# Number of transfers per chunk size, the fastest one is taken
+repetitions = 3
+# File with the tuned chunk sizes per instrument model and interface
+profile_file = os.path.join(os.path.expanduser('~'), 'RsInstrument_chunk_size_profile.json')
+# Set to True to probe again even if the profile already contains a value
+force_tuning = False
+# Set to True to run against the local socket simulator instead of an instrument
+use_simulator = False
+simulator_port = 5025
+simulator_samples = 10000000
+
+
+def interface_name(resource):
+    """Return the interface type of the VISA resource string"""
+    resource = resource.upper()
+    if 'HISLIP' in resource:
+        return 'HISLIP'
+    if resource.endswith('::SOCKET'):
+        return 'SOCKET'
+    if resource.startswith('TCPIP'):
+        return 'VXI11'
+    return resource.split('::')[0].rstrip('0123456789')
+
+
+def load_profile():
+    if not os.path.exists(profile_file):
+        return {}
+    with open(profile_file, 'r') as file:
+        return json.load(file)
+
+
+def save_profile(profile):
+    with open(profile_file, 'w') as file:
+        json.dump(profile, file, indent=2)
+
+
+def probe_chunk_sizes(instr, query):
+    """Transfer the data block with every chunk size and return a list of (chunk size, MB/s)"""
+    results = []
+    for chunk_size in chunk_sizes:
+        instr.data_chunk_size = chunk_size
+        fastest = None
+        size = 0
+        for _ in range(repetitions):
+            start = time()
+            size = len(instr.query_bin_block(query))
+            elapsed = time() - start
+            fastest = elapsed if fastest is None else min(fastest, elapsed)
+        results.append((chunk_size, size / 1e6 / fastest))
+    return results
+
+
+def get_tuned_chunk_size(instr, resource, query, force=False):
+    """Return the best chunk size for this instrument model and interface.
+    The value is taken from the profile, or probed and stored if not available yet."""
+    key = f'{instr.full_instrument_model_name} / {interface_name(resource)}'
+    profile = load_profile()
+    if key in profile and not force:
+        print(f'Using stored chunk size for {key}')
+        return profile[key]['chunk_size']
+
+    print(f'Probing chunk sizes for {key} ...')
+    results = probe_chunk_sizes(instr, query)
+    print(f'{"Chunk size":>12}  {"MB/s":>8}')
+    for chunk_size, rate in results:
+        print(f'{chunk_size:>12}  {rate:8.1f}')
+    best_chunk_size, best_rate = max(results, key=lambda x: x[1])
+    profile[key] = {'chunk_size': best_chunk_size, 'mb_per_sec': round(best_rate, 1),
+                    'results': [[chunk_size, round(rate, 1)] for chunk_size, rate in results]}
+    save_profile(profile)
+    print(f'Best chunk size: {best_chunk_size} bytes ({best_rate:.1f} MB/s), stored in {profile_file}')
+    return best_chunk_size
+
+
+def run_simulator(port, samples):
+    """Minimal SCPI socket simulator, answers CHAN:DATA? with a REAL,32 block of the given size"""
+    payload = bytes(samples * 4)  # All samples 0.0
+    block = f'#{len(str(len(payload)))}{len(payload)}'.encode() + payload + b'\n'
+    answers = {'*IDN?': 'Rohde&Schwarz,RTO-SIM,1234567890,1.0.0', '*OPT?': '0', '*OPC?': '1', '*STB?': '0',
+               '*ESR?': '0', 'SYST:ERR?': '0,"No error"', 'SYST:ERR:ALL?': '0,"No error"'}
+
+    def handle(connection):
+        with connection:
+            stream = connection.makefile('rb')
+            for line in stream:
+                for command in line.decode().strip().split(';'):
+                    command = command.strip().lstrip(':').upper()
+                    if not command.endswith('?'):
+                        continue
+                    if command.endswith('DATA?'):
+                        connection.sendall(block)
+                    else:
+                        connection.sendall(answers.get(command, '0').encode() + b'\n')
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', port))
+    server.listen(1)
+
+    def serve():
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+
+
+def main():
+    # Make sure you have the last version of the RsInstrument
+    RsInstrument.assert_minimum_version('1.53.0')
+    resource = resource_string
+    options = ''
+    if use_simulator:
+        run_simulator(simulator_port, simulator_samples)
+        resource = f'TCPIP::127.0.0.1::{simulator_port}::SOCKET'
+        options = "SelectVisa='socket'"  # Plain socket communication, no VISA needed
+    instr = None
+    try:
+        instr = RsInstrument(resource, True, False, options)
+        instr.visa_timeout = 20000  # Timeout for VISA Read Operations
+        instr.opc_timeout = 3000  # Timeout for opc-synchronised operations
+        instr.instrument_status_checking = True  # Error check after each command
+    except Exception as ex:
+        print('Error initializing the instrument session:\n' + ex.args[0])
+        exit()
+
+    print(f'Device IDN: {instr.idn_string}')
+    instr.write_str("FORMat:DATA REAL,32;:FORMat:BORDer LSBFirst")
+    instr.query_opc()
+    instr.bin_float_numbers_format = BinFloatFormat.Single_4bytes
+
+    # The tuned value replaces the fixed 'data_chunk_size = 100000' of the waveform examples
+    instr.data_chunk_size = get_tuned_chunk_size(instr, resource, waveform_query, force_tuning)
+    start = time()
+    data_bin = instr.query_bin_or_ascii_float_list(waveform_query)
+    print(f'Binary waveform transfer with chunk size {instr.data_chunk_size}: '
+          f'{len(data_bin)} samples in {time() - start:.3f}sec')
+
+    instr.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,18 @@
 Created on 2022/04
 
 Author: Jahns_P
-Version Number: 2
-Date of last change: 2022/04/21
+Version Number: 3
+Date of last change: 2026/10/18
 Requires: FPC1x00 series SPA, FW 1.70 or newer and adequate options
 - Installed RsInstrument Python module from pypi.org
 - Installed VISA e.g. R&S Visa 5.12.x or newer
+- Installed numpy Python module
 
 Description: Setup measurement, get trace data, slice it, calculate frequency list, and save data to a local CSV file
+The trace is read in binary format (REAL,32), the frequency list is built with one np.linspace call and the file
+is written with one np.savetxt call. Instead of waiting a fixed time for the max hold trace, a single sweep with
+sweep_count sweeps is started and its end is detected with the Event Status Register.
+With captures > 1, the traces are appended with a timestamp as rows to the file (one column per frequency).
 
 
 General Information:
@@ -25,12 +30,16 @@ https://rsinstrument.readthedocs.io/en/latest/
 """
 
 from RsInstrument import *
-from time import sleep
+from time import sleep, time
+import numpy as np
 
 # Define variables
 resource = 'TCPIP::10.205.0.184::INSTR'  # VISA resource string for the device
 # resource = 'TCPIP::172.16.10.10::INSTR'  # Original resource string when using USB connection
-recdur = 10  # Time in seconds to find max hold peaks
+recdur = 10  # Time in seconds to find max hold peaks, only used with sweep_count = 0
+sweep_count = 20  # Number of max hold sweeps, 0: wait recdur seconds in continuous mode instead
+captures = 1  # Number of traces, with more than one the traces are appended to the file
+use_binary = True  # Read the trace data in REAL,32 format instead of ASCII
 filename = r'C:\test\TraceFile.CSV'
 
 # Define the device handle
@@ -83,38 +92,73 @@ def meas_prep():
     instrument.write_str_with_opc('DISPlay:TRACe1:MODE MAXHold')  # Trace to Max Hold
 
 
+def wait_for_operation_complete(timeout, min_wait=0.05, max_wait=1.0):
+    """Wait for bit 0 (Operation Complete) of the Event Status Register.
+    The wait time between the queries is doubled up to max_wait."""
+    wait = min_wait
+    deadline = time() + timeout
+    while not instrument.query_int('*ESR?') & 1:
+        if time() > deadline:
+            raise TimeoutError(f'Measurement not complete after {timeout} s')
+        sleep(wait)
+        wait = min(wait * 2, max_wait)
+
+
+def trace_measure():
+    """Perform the max hold measurement"""
+    if sweep_count > 0:
+        instrument.write_str_with_opc(f'SWEep:COUNt {sweep_count}')  # Max hold over sweep_count sweeps
+        instrument.write_str_with_opc('INITiate:CONTinuous OFF')  # Single sweep mode
+        sweep_time = instrument.query_float('SWEep:TIME?')
+        instrument.query_int('*ESR?')  # Clear the Event Status Register
+        instrument.write_str('INITiate;*OPC')  # Start the sweeps, bit 0 of the ESR is set after the last one
+        print('Please wait for maxima to be found...')
+        wait_for_operation_complete(timeout=10 + 2 * sweep_time * sweep_count)
+    else:
+        instrument.write_str_with_opc('INITiate:CONTinuous ON')  # Continuous measurement on trace 1 ON
+        print('Please wait for maxima to be found...')
+        sleep(int(recdur))  # Wait for preset record time
+        instrument.write('DISPlay:TRACe1:MODE VIEW')  # Continuous measurement on trace 1 OFF
+        instrument.query_opc()
+
+
+def trace_read():
+    """Read y data (amplitude for each point) of trace 1 as numpy array"""
+    if use_binary:
+        instrument.write_str('FORMat:DATA REAL,32')
+        return np.frombuffer(instrument.query_bin_block('Trace:DATA? TRACe1'), dtype='<f4')
+    return np.array(instrument.query_str('Trace:DATA? TRACe1').split(','), dtype=np.float64)
+
+
+def frequency_list(points):
+    """Reconstruct x data (frequency for each point) as it can not be directly read from the instrument"""
+    start_freq, stop_freq = [float(x) for x in instrument.query_str('FREQuency:STARt?;:FREQuency:STOP?').split(';')]
+    return np.linspace(start_freq, stop_freq, points)
+
+
 def trace_get():
-    """Initialize continuous measurement, stop it after the desired time, query trace data"""
-
-    instrument.write_str_with_opc('INITiate:CONTinuous ON')  # Continuous measurement on trace 1 ON
-    print('Please wait for maxima to be found...')
-    sleep(int(recdur))  # Wait for preset record time
-    instrument.write('DISPlay:TRACe1:MODE VIEW')  # Continuous measurement on trace 1 OFF
-    instrument.query_opc()
-    sleep(0.5)
-
-    # Get y data (amplitude for each point)
-    trace_data = instrument.query('Trace:DATA? TRACe1')  # Read y data of trace 1
-    csv_trace_data = trace_data.split(",")  # Slice the amplitude list
-    trace_len = len(csv_trace_data)  # Get number of elements of this list
-
-    # Reconstruct x data (frequency for each point) as it can not be directly read from the instrument
-    start_freq = instrument.query_float('FREQuency:STARt?')
-    span = instrument.query_float('FREQuency:SPAN?')
-    step_size = span / (trace_len-1)
-
-    # Now write values into file
-    file = open(filename, 'w')  # Open file for writing
-    file.write("Frequency in Hz;Power in dBm\n")  # Write the headline
-    x = 0  # Set counter to 0 as list starts with 0
-    while x < int(trace_len):  # Perform loop until all sweep points are covered
-        file.write(f'{(start_freq + x * step_size):.1f}')  # Write adequate frequency information
-        file.write(";")
-        amp = float(csv_trace_data[x])
-        file.write(f'{amp:.2f}')  # Write adequate amplitude information
-        file.write("\n")
-        x = x+1
-    file.close()  # CLose the file
+    """Measure, query trace data and write it into the file with one call"""
+    trace_measure()
+    trace_data = trace_read()
+    freq = frequency_list(len(trace_data))
+    np.savetxt(filename, np.column_stack((freq, trace_data)), fmt=('%.1f', '%.2f'), delimiter=';',
+               header='Frequency in Hz;Power in dBm', comments='')
+
+
+def traces_log():
+    """Measure several times and append every trace with a timestamp as one row to the file"""
+    with open(filename, 'a') as file:
+        for capture in range(captures):
+            trace_measure()
+            timestamp = time()
+            trace_data = trace_read()
+            if file.tell() == 0:
+                # New file: the headline contains the frequencies
+                freq = frequency_list(len(trace_data))
+                file.write('Timestamp;' + ';'.join(f'{f:.1f}' for f in freq) + '\n')
+            np.savetxt(file, np.concatenate(([timestamp], trace_data))[np.newaxis],
+                       fmt=['%.3f'] + ['%.2f'] * len(trace_data), delimiter=';')
+            print(f'Trace {capture + 1} of {captures} written')
     
 #
 # -------------------------
@@ -126,7 +170,10 @@ def trace_get():
 com_prep()
 com_check()
 meas_prep()
-trace_get()
+if captures > 1:
+    traces_log()
+else:
+    trace_get()
 close()
 
 
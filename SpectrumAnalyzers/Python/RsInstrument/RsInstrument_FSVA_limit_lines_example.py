@@ -1,11 +1,170 @@
 # GitHub examples repository path: SpectrumAnalyzers/Python/RsInstrument
 # Example for FSW / FSV / FSVA / FPS Spectrum Analyzers
+# The limit lines are defined as LimitLine objects and kept in a LimitLibrary, keyed by name.
+# - The complete definition of a limit line is uploaded with one SCPI message.
+# - The library remembers which definition is loaded in which limit line of the instrument, stored per instrument
+#   (serial number) in a JSON index file, also across runs. Only missing or changed limit lines are uploaded,
+#   the activation and the trace assignment are sent every time.
+# - The traces are read in binary format (REAL,32) and checked against the limit lines on the PC with numpy,
+#   including the margin. Many traces can be checked against many limit lines without instrument round trips.
 # Preconditions:
 # - Installed RsInstrument Python module from pypi.org
 # - Installed VISA e.g. R&S Visa 5.12.x or newer
+# - Installed numpy Python module
 
+import hashlib
+import json
+import os
+from typing import NamedTuple
+import numpy as np
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
 
+# Local index of the limit line definitions loaded in the instruments
+LIMIT_INDEX_FILE = os.path.join(os.path.expanduser('~'), 'RsInstrument_FSVA_limit_line_index.json')
+
+
+class LimitResult(NamedTuple):
+	passed: np.ndarray  # Limit check result per trace
+	in_margin: np.ndarray  # Passed, but closer to the limit line than its margin
+	margin: np.ndarray  # Smallest distance to the limit line per trace / dB, negative: violation
+	violations: np.ndarray  # Number of trace points violating the limit line per trace
+
+
+class LimitLine:
+	"""Upper or lower limit line with absolute frequencies (CALC:LIM<n>:CONT:MODE ABS)"""
+
+	def __init__(self, name, number, side, freq, values, y_mode='ABS', unit='DBM', margin=0.0, shift=0.0,
+				 offset=0.0, threshold=None, traces=()):
+		self.name = name
+		self.number = number  # Limit line number on the instrument (CALC:LIM<n>)
+		self.side = side  # 'UPP' or 'LOW'
+		self.freq = np.asarray(freq, dtype=np.float64)  # Horizontal definition points / Hz
+		self.values = np.asarray(values, dtype=np.float64)  # Vertical definition points
+		self.y_mode = y_mode  # 'ABS' or 'REL' to the reference level
+		self.unit = unit
+		self.margin = margin  # dB
+		self.shift = shift  # dB
+		self.offset = offset  # dB
+		self.threshold = threshold  # dBm, only for relative limit lines, None: no threshold
+		self.traces = traces  # Traces checked against the limit line
+
+	def commands(self):
+		"""SCPI commands of the complete definition"""
+		lim = f'CALC:LIM{self.number}'
+		side = f'{lim}:{self.side}'
+		commands = [f"{lim}:NAME '{self.name}'",
+					f'{lim}:CONT:MODE ABS',
+					f'{side}:MODE {self.y_mode}',
+					f'{lim}:UNIT {self.unit}',
+					f'{lim}:CONT ' + ','.join(f'{x:.12g}' for x in self.freq),
+					f'{side} ' + ','.join(f'{y:.12g}' for y in self.values),
+					f'{side}:MARG {self.margin}dB',
+					f'{side}:SHIF {self.shift}',  # Shifts the definition points, so it must follow them
+					f'{side}:OFFS {self.offset}']
+		if self.threshold is not None:
+			commands.append(f'{side}:THR {self.threshold}DBM')
+		return commands
+
+	def activation_commands(self):
+		"""SCPI commands to activate the limit line and to check it against its traces"""
+		lim = f'CALC:LIM{self.number}'
+		return [f'{lim}:{self.side}:STAT ON'] + [f'{lim}:TRAC{trace}:CHEC ON' for trace in self.traces]
+
+	def fingerprint(self):
+		return hashlib.sha256('\n'.join(self.commands()).encode()).hexdigest()
+
+	def limit(self, freq, ref_level):
+		"""Limit / dBm at the trace frequencies, NaN outside the definition range where nothing is checked"""
+		limit = np.interp(freq, self.freq, self.values + self.shift + self.offset, left=np.nan, right=np.nan)
+		if self.y_mode == 'REL':
+			limit = limit + ref_level
+			if self.threshold is not None:
+				# A relative limit line below the threshold is checked at the threshold
+				limit = np.maximum(limit, self.threshold)
+		return limit
+
+	def evaluate(self, freq, traces, ref_level):
+		"""Check one trace or an array of traces (traces x points) / dBm against the limit line"""
+		traces = np.atleast_2d(traces)
+		limit = self.limit(freq, ref_level)
+		checked = ~np.isnan(limit)
+		if self.side == 'UPP':
+			distance = limit[checked] - traces[:, checked]
+		else:
+			distance = traces[:, checked] - limit[checked]
+		margin = distance.min(axis=1) if distance.shape[1] else np.full(len(traces), np.inf)
+		passed = margin >= 0
+		return LimitResult(passed, passed & (margin < self.margin), margin, np.count_nonzero(distance < 0, axis=1))
+
+
+class LimitLibrary:
+	"""Limit lines keyed by name, and the definitions loaded in the instruments.
+	The fingerprints of the loaded definitions are stored per instrument in LIMIT_INDEX_FILE."""
+
+	def __init__(self, lines=()):
+		self.lines = {line.name: line for line in lines}
+
+	def add(self, line):
+		self.lines[line.name] = line
+
+	@staticmethod
+	def load_index(key):
+		"""Return {limit line number: fingerprint of the uploaded definition} of the instrument"""
+		if not os.path.exists(LIMIT_INDEX_FILE):
+			return {}
+		with open(LIMIT_INDEX_FILE) as file:
+			return json.load(file).get(key, {})
+
+	@staticmethod
+	def save_index(key, loaded):
+		indexes = {}
+		if os.path.exists(LIMIT_INDEX_FILE):
+			with open(LIMIT_INDEX_FILE) as file:
+				indexes = json.load(file)
+		indexes[key] = loaded
+		with open(LIMIT_INDEX_FILE, 'w') as file:
+			json.dump(indexes, file, indent=2)
+
+	def upload(self, instr, names):
+		"""Upload the missing or changed limit lines and activate all of them in one message.
+		Returns the names of the uploaded lines"""
+		key = f'{instr.full_instrument_model_name} {instr.instrument_serial_number}'
+		loaded = self.load_index(key)
+		lines = [self.lines[name] for name in names]
+		# The names of the limit lines on the instrument, one query for all
+		present = instr.query(';:'.join(f'CALC:LIM{line.number}:NAME?' for line in lines)).split(';')
+		commands = []
+		uploaded = []
+		for line, present_name in zip(lines, present):
+			fingerprint = line.fingerprint()
+			# JSON keys are strings
+			if present_name.strip(" '\"") != line.name or loaded.get(str(line.number)) != fingerprint:
+				commands += line.commands()
+				loaded[str(line.number)] = fingerprint
+				uploaded.append(line.name)
+			commands += line.activation_commands()
+		instr.write(';:'.join(commands))
+		instr.query_opc()
+		if uploaded:
+			self.save_index(key, loaded)
+		return uploaded
+
+	def check(self, freq, traces, ref_level, names=None):
+		"""Check the traces (traces x points) / dBm against the limit lines. Returns {name: LimitResult}"""
+		return {name: self.lines[name].evaluate(freq, traces, ref_level) for name in (names or self.lines)}
+
+
+def fetch_traces(instr, trace_numbers):
+	"""Read the traces in binary format. Returns the frequencies and the traces (traces x points) / dBm"""
+	instr.write('FORM REAL,32')
+	points = instr.query_int('SWE:POIN?')
+	start, stop = (float(x) for x in instr.query('FREQ:STAR?;:FREQ:STOP?').split(';'))
+	traces = np.array([np.frombuffer(instr.query_bin_block(f'TRAC:DATA? TRACE{trace}'), dtype='<f4')
+					   for trace in trace_numbers])
+	instr.write('FORM ASC')
+	return np.linspace(start, stop, points), traces
+
+
 io = None
 RsInstrument.assert_minimum_version('1.82.1')
 try:
@@ -25,89 +184,37 @@ io.write('INIT:CONT OFF')
 # Selects single sweep mode.
 io.write('SYStem:DISPlay:UPDate ON')
 
-# ------------- Configuring the limit lines ---------------------
-io.write("CALC:LIM1:NAME 'FM1'")
-# Names limit line 1 'FM1'.
-
-io.write('CALC:LIM1:CONT:MODE ABS')
-# Selects absolute scaling for the horizontal axis.
-io.write('CALC:LIM1:CONT 1 MHz,50MHz,100 MHz,150MHz,200MHz')
-# Defines 5 horizontal definition points for limit line 1.
-io.write('CALC:LIM1:UPP:MODE ABS')
-# Selects an absolute vertical scale for limit line 1.
-io.write('CALC:LIM1:UNIT DBM')
-# Selects the unit dBm for limit line 1.
-io.write('CALC:LIM1:UPP -10,-5,0,-5,-10')
-# Defines 5 definition points for limit line 1.
-
-io.write('CALC:LIM1:UPP:MARG 5dB')
-# Defines an area of 5 dB around limit line 1 where limit check violations
-# are still tolerated.
-
-io.write('CALC:LIM1:UPP:SHIF -10DB')
-# Shifts the limit line 1 by -10 dB.
-io.write('CALC:LIM1:UPP:OFFS -3dB')
-# Defines an additional -3 dB offset for limit line 1.
-
-io.write("CALC:LIM3:NAME 'FM3'")
-# Names limit line 3 'FM3'.
-
-io.write('CALC:LIM3:LOW:MODE REL')
-# Selects a relative vertical scale for limit line 3.
-io.write('CALC:LIM3:UNIT DB')
-
-io.write('CALC:LIM3:CONT 1 MHz,50MHz,100 MHz,150MHz,200MHz')
-# Defines 5 horizontal definition points for limit line 3.
-io.write('CALC:LIM3:LOW -90,-60,-40,-60,-90')
-# Defines 5 definition points relative to the reference level for limit line 3.
-
-io.write('CALC:LIM3:LOW:SHIF 2')
-# Shifts the limit line 3 by 2dB.
-io.write('CALC:LIM3:LOW:OFFS 3')
-# Defines an additional 3 dB offset for limit line 3.
-
-io.write('CALC:LIM3:LOW:THR -200DBM')
-# Defines a power threshold of -200dBm that must be exceeded for limit to be checked
-
-io.write('CALC:LIM3:LOW:MARG 5dB')
-# Defines an area of 5dB around limit line 3 where limit check violations
-# are still tolerated.
+# ------------- Defining the limit lines ---------------------
+library = LimitLibrary([
+	# Upper limit line 1 'FM1' with absolute values in dBm, 5 definition points, checked against trace 3 (max hold).
+	# A margin of 5 dB, shifted by -10 dB and an additional -3 dB offset.
+	LimitLine('FM1', 1, 'UPP', [1e6, 50e6, 100e6, 150e6, 200e6], [-10, -5, 0, -5, -10],
+			  margin=5, shift=-10, offset=-3, traces=(3,)),
+	# Lower limit line 3 'FM3' relative to the reference level, checked against trace 2 (average).
+	# Shifted by 2 dB, an additional 3 dB offset, a margin of 5 dB and a power threshold of -200 dBm.
+	LimitLine('FM3', 3, 'LOW', [1e6, 50e6, 100e6, 150e6, 200e6], [-90, -60, -40, -60, -90],
+			  y_mode='REL', unit='DB', margin=5, shift=2, offset=3, threshold=-200, traces=(2,)),
+])
 
 # --------------Configuring the measurement -------------
-io.write('FREQ:CENT 100MHz')
-# Defines the center frequency
-io.write('FREQ:SPAN 200MHz')
-# Sets the span to 100 MHz on either side of the center frequency.
-io.write('SENS:SWE:COUN 10')
-# Defines 10 sweeps to be performed in each measurement.
-io.write('DISP:TRAC1:Y:RLEV 0dBm')
-# Sets the reference level to 0 dBm.
-io.write('TRIG:SOUR IFP')
-io.write('TRIG:LEV:IFP -10dBm')
-# Defines triggering when the second intermediate frequency rises to a level
-# of -10 dBm.
+io.write('FREQ:CENT 100MHz;:FREQ:SPAN 200MHz;:SENS:SWE:COUN 10;:DISP:TRAC1:Y:RLEV 0dBm;'
+		 ':TRIG:SOUR IFP;:TRIG:LEV:IFP -10dBm')
+# Center frequency 100 MHz, span 200 MHz, 10 sweeps per measurement, reference level 0 dBm.
+# Triggering when the second intermediate frequency rises to a level of -10 dBm.
 
 # --------------Configuring the Trace--------------------------
-io.write('DISP:TRAC2 ON')
-io.write('DISP:TRAC2:MODE AVER')
-io.write('DISP:TRAC3 ON')
-io.write('DISP:TRAC3:MODE MAXH')
+io.write('DISP:TRAC2 ON;:DISP:TRAC2:MODE AVER;:DISP:TRAC3 ON;:DISP:TRAC3:MODE MAXH')
 # Configures 3 traces: 1 (default): clear/write; 2: average; 3: max hold
 
 # ------------- Configuring the limit check -------------------
-io.write("CALC:LIM1:NAME 'FM1'")
-io.write('CALC:LIM1:UPP:STAT ON')
-# Activates upper limit FM1 as line 1.
-io.write("CALC:LIM3:NAME 'FM3'")
-io.write('CALC:LIM3:LOW:STAT ON')
-# Activates lower limit line FM3 as line 3.
+uploaded = library.upload(io, ['FM1', 'FM3'])
+print('Uploaded limit lines: ' + (', '.join(uploaded) or 'none'))
+# Uploading again only sends the changed limit lines, here none
+print('Uploaded limit lines after the second call: ' + (', '.join(library.upload(io, ['FM1', 'FM3'])) or 'none'))
 resp = io.query('CALC:LIM:ACT?')
 # Queries the names of all active limit lines
 # Result: 'FM1,FM3'
-io.write('CALC:LIM1:TRAC3:CHEC ON')
-# Activates the upper limit to be checked against trace3 (maxhold trace)
-io.write('CALC:LIM3:TRAC2:CHEC ON')
-# Activates the upper limit to be checked against trace2 (average trace)
+print('Active limit lines: ' + resp)
 io.write('CALC:LIM:CLE')
 # Clears the previous limit check results
 
@@ -116,8 +223,17 @@ io.write('INIT;*WAI')
 # Initiates a new measurement and waits until the last sweep has finished.
 
 # -------------- Retrieving limit check results----------------------------
-
 lim1_fail = io.query('CALC:LIM1:FAIL?')  # Queries the result of the upper limit line check
 print('Limit 1 fail: ' + lim1_fail)
 lim2_fail = io.query('CALC:LIM3:FAIL?')  # Queries the result of the lower limit line check
 print('Limit 2 fail: ' + lim2_fail)
+
+# -------------- Limit check on the PC ----------------------------
+trace_numbers = [1, 2, 3]
+freq, traces = fetch_traces(io, trace_numbers)
+ref_level = io.query_float('DISP:TRAC1:Y:RLEV?')
+# All traces against all limit lines, without further queries
+for name, result in library.check(freq, traces, ref_level).items():
+	for trace, passed, in_margin, margin, violations in zip(trace_numbers, *result):
+		state = ('MARGIN' if in_margin else 'PASS') if passed else 'FAIL'
+		print(f'{name} / trace {trace}: {state}, margin {margin:.2f} dB, {violations} points violating')
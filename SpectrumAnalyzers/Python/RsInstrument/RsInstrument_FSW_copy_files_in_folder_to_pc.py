@@ -1,68 +1,168 @@
 # GitHub examples repository path: SpectrumAnalyzers/Python/RsInstrument
 # Example for FSW / FSV / FSVA / FPS Spectrum Analyzers
-# to copy all the files of one folder instrument (not recursively!!!) to your control PC.
+# to mirror one folder of the instrument including all subfolders to your control PC.
+# - The instrument folder tree is listed recursively with MMEMory:CATalog:LONG?
+# - A local manifest (mirror_manifest.json in the PC folder) stores the name and size of every copied file.
+#   Only new or changed files are transferred. With verify_hash, the SHA-256 of the local files is checked as well.
+# - Every file is copied into a .part file and renamed when complete, then one line is appended to a journal
+#   (mirror_manifest.jsonl). The journal is merged into the manifest at the end of the run.
+#   If the transfer is interrupted, the next run continues with the files not copied yet.
+# - A file that cannot be copied is reported and skipped, the other files are still copied.
+# - The transfer rate is reported per file and in total.
+# - Several instruments are mirrored in parallel, one thread per instrument.
 # Preconditions:
 # - Installed RsInstrument Python module 1.70+ from pypi.org
 # - Installed VISA e.g. R&S Visa 5.12.x or newer
 
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
 from time import time
-from random import random
 
-instr_dir = 'C:/R_S/instr/user' # Adjust this path to fit your instrument
-pc_dir = 'c:/temp/copy_temp'
+# Instruments to mirror: VISA resource string -> (instrument folder, PC folder)
+mirrors = {'TCPIP::localhost::INSTR': ('C:/R_S/instr/user', 'c:/temp/copy_temp')}  # Adjust the paths to fit your instruments
+verify_hash = False  # Also compare the SHA-256 of the local files with the manifest
+MANIFEST_NAME = 'mirror_manifest.json'
+JOURNAL_NAME = 'mirror_manifest.jsonl'
 
-fsw = None
 RsInstrument.assert_minimum_version('1.70.0')
-try:
-	# Adjust the VISA Resource string to fit your instrument
-	fsw = RsInstrument('TCPIP::localhost::INSTR', True, False, options='SelectVisa=ni')
-	fsw.visa_timeout = 1500  # Timeout for VISA Read Operations
-	fsw.instrument_status_checking = True  # Error check after each command
-except Exception as ex:
-	print('Error initializing the instrument session:\n' + ex.args[0])
-	exit()
-
-print(f'Driver Version: {fsw.driver_version}')
-print(f'SpecAn IDN: {fsw.idn_string}')
-print(f'SpecAn Options: {",".join(fsw.instrument_options)}')
-
-# change the current instrument directory to our desired one
-if not os.path.exists(pc_dir):
-	os.makedirs(pc_dir)
-fsw.write(f"MMEMory:CDIRectory '{instr_dir}'")
-items = [x.strip('"') for x in fsw.query_str_list("MMEMory:CATalog:LONG?")]
-items_plain = fsw.query_str("MMEMory:CATalog:LONG?")
-items.pop(0)
-items.pop(0)
-resh_items = [items[i:i+3] for i in range(0, len(items), 3)]
-
-files = list(filter(lambda x: x[1] != 'DIR', resh_items))
-uq_files = []
-[uq_files.append(item) for item in files if item not in uq_files]
-
-folders = list(filter(lambda x: x[1] == 'DIR', resh_items))
-uq_folders = []
-[uq_folders.append(item) for item in folders if item not in uq_folders]
-
-print(f'Files count: {len(uq_files)}')
-print(f'Folders count: {len(uq_folders)}')
-
-i = 1
-for el in uq_files:
-	print(f'File {i} / {len(files)}: {el[0]}, size {el[2]} bytes, copying ...', end='')
-	instr_file = instr_dir + '/' + el[0] + ("aa" if random() > 0.65 else '')
-	pc_file = pc_dir + '/' + el[0]
-	# We put a error guard here to isolate each file copy exception
-	with fsw.visa_tout_suppressor() as supp:
-		fsw.clear_status()
-		fsw.read_file_from_instrument_to_pc(instr_file, pc_file)
-	if supp.get_timeout_occurred():
-		print('ERROR')
-	else:
-		print('OK')
-	i+=1
-
-# Close the session
-fsw.close()
+
+
+def list_tree(fsw, instr_dir, rel_dir=''):
+	"""Return {relative path: size} of all files in the instrument folder and its subfolders"""
+	folder = instr_dir + ('/' + rel_dir if rel_dir else '')
+	fsw.write(f"MMEMory:CDIRectory '{folder}'")
+	items = [x.strip('"') for x in fsw.query_str_list("MMEMory:CATalog:LONG?")]
+	# The first two values are the used and free disk space, then name, type and size of every entry
+	items = items[2:]
+	files = {}
+	for name, kind, size in (items[i:i + 3] for i in range(0, len(items), 3)):
+		rel_path = rel_dir + '/' + name if rel_dir else name
+		if kind == 'DIR':
+			if name not in ('.', '..'):
+				files.update(list_tree(fsw, instr_dir, rel_path))
+		else:
+			files[rel_path] = int(size)
+	return files
+
+
+def file_hash(path):
+	"""SHA-256 of the file content"""
+	sha = hashlib.sha256()
+	with open(path, 'rb') as file:
+		for block in iter(lambda: file.read(1024 * 1024), b''):
+			sha.update(block)
+	return sha.hexdigest()
+
+
+def load_manifest(pc_dir):
+	"""Manifest of the last complete run plus the journal lines of an interrupted run"""
+	manifest = {}
+	path = os.path.join(pc_dir, MANIFEST_NAME)
+	if os.path.exists(path):
+		with open(path) as file:
+			manifest = json.load(file)
+	journal = os.path.join(pc_dir, JOURNAL_NAME)
+	if os.path.exists(journal):
+		with open(journal) as file:
+			for line in file:
+				try:
+					rel_path, entry = json.loads(line)
+				except ValueError:
+					continue  # Line only partly written when the run was interrupted
+				manifest[rel_path] = entry
+	return manifest
+
+
+def save_manifest(pc_dir, manifest):
+	"""Write the complete manifest and remove the journal"""
+	path = os.path.join(pc_dir, MANIFEST_NAME)
+	with open(path + '.tmp', 'w') as file:
+		json.dump(manifest, file, indent=1)
+	os.replace(path + '.tmp', path)  # The manifest is never left half written
+	journal = os.path.join(pc_dir, JOURNAL_NAME)
+	if os.path.exists(journal):
+		os.remove(journal)
+
+
+def is_up_to_date(pc_file, size, entry):
+	"""Compare the local file with the instrument file size and the manifest entry"""
+	if entry is None or entry['size'] != size or not os.path.exists(pc_file) or os.path.getsize(pc_file) != size:
+		return False
+	return not verify_hash or file_hash(pc_file) == entry['hash']
+
+
+def mirror(resource, instr_dir, pc_dir):
+	"""Copy all new or changed files of the instrument folder tree, return (files, bytes, seconds, errors)"""
+	fsw = RsInstrument(resource, True, False, options='SelectVisa=ni')
+	try:
+		fsw.visa_timeout = 5000  # Timeout for VISA Read Operations
+		fsw.instrument_status_checking = True  # Error check after each command
+		name = fsw.idn_string.split(',')[2] if fsw.idn_string.count(',') >= 2 else resource
+		print(f'{name}: {fsw.idn_string}')
+
+		os.makedirs(pc_dir, exist_ok=True)
+		files = list_tree(fsw, instr_dir)
+		manifest = load_manifest(pc_dir)
+		to_copy = [(rel_path, size) for rel_path, size in files.items()
+				   if not is_up_to_date(os.path.join(pc_dir, rel_path), size, manifest.get(rel_path))]
+		print(f'{name}: {len(files)} files, {len(to_copy)} to copy')
+
+		copied, copied_bytes, errors = 0, 0, 0
+		start = time()
+		with open(os.path.join(pc_dir, JOURNAL_NAME), 'a') as journal:
+			for i, (rel_path, size) in enumerate(to_copy, 1):
+				pc_file = os.path.join(pc_dir, rel_path)
+				os.makedirs(os.path.dirname(pc_file), exist_ok=True)
+				file_start = time()
+				# We put a error guard here to isolate each file copy exception
+				try:
+					with fsw.visa_tout_suppressor() as supp:
+						fsw.clear_status()
+						fsw.read_file_from_instrument_to_pc(instr_dir + '/' + rel_path, pc_file + '.part')
+					failed = supp.get_timeout_occurred() or not os.path.exists(pc_file + '.part')
+				except StatusException as ex:
+					print(f'{name}: file {i} / {len(to_copy)}: {rel_path} - {ex}')
+					failed = True
+				if failed:
+					print(f'{name}: file {i} / {len(to_copy)}: {rel_path} ERROR')
+					errors += 1
+					continue
+				os.replace(pc_file + '.part', pc_file)
+				duration = max(time() - file_start, 1e-6)
+				manifest[rel_path] = {'size': size, 'hash': file_hash(pc_file) if verify_hash else None}
+				# One journal line per file instead of rewriting the whole manifest
+				journal.write(json.dumps([rel_path, manifest[rel_path]]) + '\n')
+				journal.flush()
+				copied += 1
+				copied_bytes += size
+				print(f'{name}: file {i} / {len(to_copy)}: {rel_path}, {size} bytes, {size / duration / 1e6:.2f} MB/s')
+
+		# Files deleted on the instrument are removed from the manifest, the local copies are kept
+		for rel_path in set(manifest) - set(files):
+			del manifest[rel_path]
+		save_manifest(pc_dir, manifest)
+		return copied, copied_bytes, time() - start, errors
+	finally:
+		fsw.close()
+
+
+start_total = time()
+# At least one worker, ThreadPoolExecutor rejects max_workers=0 for an empty mirrors dictionary
+with ThreadPoolExecutor(max_workers=max(1, len(mirrors))) as pool:
+	jobs = {resource: pool.submit(mirror, resource, instr_dir, pc_dir) for resource, (instr_dir, pc_dir) in mirrors.items()}
+total_bytes = 0
+for resource, job in jobs.items():
+	try:
+		copied, copied_bytes, duration, errors = job.result()
+	except Exception as ex:
+		print(f'{resource}: mirror failed - {ex}')
+		continue
+	total_bytes += copied_bytes
+	rate = copied_bytes / duration / 1e6 if duration > 0 else 0
+	print(f'{resource}: {copied} files, {copied_bytes / 1e6:.1f} MB in {duration:.1f} s ({rate:.2f} MB/s), {errors} errors')
+elapsed = time() - start_total
+total_rate = total_bytes / elapsed / 1e6 if elapsed > 0 else 0
+print(f'Total: {total_bytes / 1e6:.1f} MB in {elapsed:.1f} s ({total_rate:.2f} MB/s)')
@@ -1,13 +1,27 @@
 # GitHub examples repository path: SpectrumAnalyzers/Python/RsInstrument
 # Example for FSW / FSV / FSVA / FPS Spectrum Analyzers
 # Example for FSW showing binary IQ data read from the instrument and displayed as power spectrum
+# The IQ data is read in chunks (TRAC:IQ:DATA:MEM? <offset>,<count>) directly into a preallocated complex64 array,
+# or into a memory-mapped .npy file for captures larger than the RAM. The memory stays at one copy of the capture
+# with 8 bytes per sample, plus one chunk.
+# Optionally, a benchmark measures the transfer rate of a capture of benchmark_time seconds.
+# The power spectrum is calculated with Welch averaging (WelchPsd): the capture is cut into overlapping segments
+# of welch_segment samples, processed block by block, and the segment spectra are averaged. The windows and their
+# normalization are cached per (window type, length), the FFT size stays the same for all segments.
+# Welch averaging lowers the frequency resolution to fs / welch_segment, so it is off by default (welch_segment = 0)
+# and the full-resolution single FFT over the whole capture is displayed (full_spectrum): the flattop window is
+# calculated and applied block by block into one zero-padded complex64 FFT buffer, the capture is never copied
+# to complex128. The processing time and throughput of both methods are printed.
+# The segments of a block can be split over several threads (psd_threads), the FFT releases the GIL.
 # Preconditions:
 # - Installed RsInstrument Python module from pypi.org
 # - Installed VISA e.g. R&S Visa 5.12.x or newer
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import signal
+from scipy import signal, fft
 from RsInstrument import *  # The RsInstrument package is hosted on pypi.org, see Readme.txt for more details
 
 # Variables
@@ -16,9 +30,159 @@ fs = 100e6 			  # Sample rate (Hz)
 ct = 1e-3			  # Capture time (sec)
 freq = 3.9e9		  # Center frequency (Hz)
 RefLev = -10		  # Reference level (dBm)
+chunk_samples = 1000000  # IQ samples read with one query
+memmap_file = None	  # Path of a .npy file to hold the capture, e.g. r'c:\temp\iq_capture.npy', None: in memory
+benchmark_time = 0	  # Capture time (sec) of the throughput benchmark, e.g. 1, 0: no benchmark
+welch_segment = 0	  # Welch segment length, e.g. 4096, 0: one FFT over the whole capture (full resolution)
+welch_overlap = 0.5	  # Overlap of the Welch segments
+psd_block = 1 << 22	  # Samples processed together by the Welch engine
+psd_threads = 1		  # Threads for the Welch engine
 
 #############################################################################
 
+
+def read_iq_chunked(instr, sample_count, chunk_size, file_path=None):
+	"""Read sample_count IQ samples (IQP format, REAL,32) in chunks into one complex64 array.
+	With file_path, the array is a memory-mapped .npy file.
+	full_spectrum() and WelchPsd read this array block by block and stay in complex64, it is never
+	converted to complex128 as a whole."""
+	if file_path:
+		iq_data = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.complex64, shape=(sample_count,))
+	else:
+		iq_data = np.empty(sample_count, dtype=np.complex64)
+	for offset in range(0, sample_count, chunk_size):
+		count = min(chunk_size, sample_count - offset)
+		chunk = instr.query_bin_block(f'TRAC:IQ:DATA:MEM? {offset},{count}')
+		# I and Q values alternate, which is the memory layout of complex64
+		iq_data[offset:offset + count] = np.frombuffer(chunk, dtype='<f4').view(np.complex64)
+	return iq_data
+
+
+class WelchPsd:
+	"""Overlap-averaged power spectrum of IQ data, fed block by block with update().
+	The result is scaled like the single flattop FFT: the power of a tone in one bin."""
+
+	# (window type, length) -> (window, sum(window)^2), shared by all instances
+	windows = {}
+
+	@classmethod
+	def window(cls, window_type, length):
+		key = (window_type, length)
+		if key not in cls.windows:
+			win = signal.get_window(window_type, length).astype(np.float32)
+			cls.windows[key] = (win, float(np.square(np.sum(win, dtype=np.float64))))
+		return cls.windows[key]
+
+	def __init__(self, sample_rate, segment=4096, overlap=0.5, window_type='flattop', batch_segments=256, threads=1):
+		self.segment = segment
+		self.step = max(1, int(segment * (1 - overlap)))
+		self.win, self.norm = self.window(window_type, segment)
+		self.batch_segments = batch_segments
+		self.pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+		self.threads = threads
+		self.power_sum = np.zeros(segment, dtype=np.float64)
+		self.count = 0
+		self.tail = np.empty(0, dtype=np.complex64)
+		# Frequency offsets of the fftshift-ed bins
+		self.freq = fft.fftshift(fft.fftfreq(segment, 1 / sample_rate))
+
+	def segments_power(self, segments):
+		"""Sum of the power spectra of the segments (rows), in batches to limit the temporary memory"""
+		total = np.zeros(self.segment, dtype=np.float64)
+		for first in range(0, len(segments), self.batch_segments):
+			spectra = fft.fft(segments[first:first + self.batch_segments] * self.win, axis=1)
+			total += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=0)
+		return total
+
+	def update(self, block):
+		data = np.concatenate((self.tail, block)) if len(self.tail) else np.asarray(block)
+		if len(data) < self.segment:
+			self.tail = data.copy()
+			return
+		# All complete segments of the data as rows, without copying
+		segments = np.lib.stride_tricks.sliding_window_view(data, self.segment)[::self.step]
+		if self.pool:
+			parts = np.array_split(segments, self.threads)
+			self.power_sum += sum(self.pool.map(self.segments_power, parts))
+		else:
+			self.power_sum += self.segments_power(segments)
+		self.count += len(segments)
+		self.tail = data[len(segments) * self.step:].copy()
+
+	def process(self, iq_data, block_size):
+		"""Feed a complete capture (array or memmap) block by block"""
+		for first in range(0, len(iq_data), block_size):
+			self.update(iq_data[first:first + block_size])
+		return self.result()
+
+	def result(self):
+		"""Return the frequency offsets and the averaged power per bin (linear)"""
+		return self.freq, fft.fftshift(self.power_sum / max(self.count, 1) / self.norm)
+
+	def close(self):
+		"""Shut down the thread pool"""
+		if self.pool:
+			self.pool.shutdown()
+			self.pool = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+
+# Coefficients a0...a4 of the flattop window sum(a_k * cos(k * phase)), as scipy.signal.windows.flattop
+FLATTOP = (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368)
+# The same window as polynomial in c = cos(phase) (Chebyshev: cos(2x) = 2c^2 - 1, ...), highest power first,
+# so only one cosine per sample is needed
+FLATTOP_POLY = (8 * FLATTOP[4], 4 * FLATTOP[3], 2 * FLATTOP[2] - 8 * FLATTOP[4], FLATTOP[1] - 3 * FLATTOP[3],
+				FLATTOP[0] - FLATTOP[2] + FLATTOP[4])
+
+
+def full_spectrum(iq_data, sample_rate, block_size):
+	"""One flattop-windowed FFT over the whole capture, zero-padded to the next power of two (full resolution).
+	The window is calculated and applied block by block into one complex64 FFT buffer, so neither the
+	full window nor a complex128 copy of the capture is allocated. The FFT runs in place on the buffer.
+	Returns the frequency offsets and the power per bin (linear, float32)"""
+	n = len(iq_data)
+	nfft = 2**(n - 1).bit_length()
+	buffer = np.zeros(nfft, dtype=np.complex64)
+	win_sum = 0.0
+	for first in range(0, n, block_size):
+		count = min(block_size, n - first)
+		# Symmetric window: phase from -pi to pi over the whole capture
+		phase = -np.pi + (2 * np.pi / max(n - 1, 1)) * np.arange(first, first + count, dtype=np.float64)
+		c = np.cos(phase).astype(np.float32)
+		win = np.full(count, FLATTOP_POLY[0], dtype=np.float32)
+		for coefficient in FLATTOP_POLY[1:]:
+			win *= c
+			win += np.float32(coefficient)
+		win_sum += float(np.sum(win, dtype=np.float64))
+		np.multiply(iq_data[first:first + count], win, out=buffer[first:first + count])
+	spectrum = fft.fft(buffer, overwrite_x=True)
+	del buffer
+	power = spectrum.real ** 2
+	power += spectrum.imag ** 2
+	del spectrum
+	power /= np.float32(win_sum ** 2)
+	# Move the Nyquist point to the right-hand side (pos freq) to be
+	# consistent with plot when looking at the positive half only.
+	power = np.roll(power, nfft // 2 - 1)  # fftshift and the Nyquist point moved in one step
+	df = sample_rate / nfft
+	return np.arange(1, nfft + 1) * df - sample_rate / 2, power
+
+
+def capture_iq(instr, capture_time, file_path=None):
+	"""Perform a capture and read it, return the IQ data and the transfer time"""
+	instr.write_str(':SENS:SWE:TIME ' + str(capture_time))
+	instr.write_with_opc('INIT:IMM')
+	sample_count = int(instr.query_float('TRAC:IQ:RLEN?'))
+	start = time.time()
+	iq_data = read_iq_chunked(instr, sample_count, chunk_samples, file_path)
+	return iq_data, time.time() - start
+
+
 # Open connection
 fsw = None
 RsInstrument.assert_minimum_version('1.53.0')
@@ -48,17 +212,23 @@ fsw.write_str('FREQ:CENT ' + str(freq))
 fsw.write_with_opc('INST:CRE:NEW IQ, \'IQ Analyzer\'')
 fsw.write_str(':INIT:CONT OFF')
 fsw.write_str(':TRAC:IQ:SRAT ' + str(fs))
-fsw.write_str(':SENS:SWE:TIME ' + str(ct))
 fsw.query_str_with_opc(':LAY:ADD:WIND? \'1\',BEL,FREQ')
 fsw.query_opc()
 
-# Start measurement
-fsw.write_with_opc('INIT:IMM')
-
-# Get IQ data in binary format
+# IQ data in binary format, I and Q of every sample one after the other
 fsw.write_str('FORM REAL,32')
 fsw.write_with_opc('TRAC:IQ:DATA:FORM IQP')
-tmp = np.array(fsw.query_bin_or_ascii_float_list('TRAC:IQ:DATA:MEM?'))
+
+if benchmark_time > 0:
+	fsw.visa_timeout = 30000  # Long captures need more time for INIT:IMM
+	fsw.opc_timeout = 30000
+	bench_iq, bench_time = capture_iq(fsw, benchmark_time, memmap_file)
+	print(f'Benchmark: {len(bench_iq)} samples ({bench_iq.nbytes / 1e6:.0f} MB) in {bench_time:.2f} sec '
+		  f'-> {len(bench_iq) / bench_time / 1e6:.1f} MSa/s, {bench_iq.nbytes / bench_time / 1e6:.1f} MB/s')
+	del bench_iq  # Release the memory (or the file) before the next capture
+
+# Start measurement and get the IQ data
+iq, transfer_time = capture_iq(fsw, ct, memmap_file)
 
 # Close connection
 fsw.go_to_local()
@@ -66,38 +236,19 @@ fsw.close()
 
 ########################################################################
 
-# Create complex array of IQ data
-iq = tmp[0::2] + 1j * tmp[1::2]
+print(f'{len(iq)} IQ samples read in {transfer_time:.3f} sec')
 
-# FFT
-N = len(iq)
-
-# Window function
-win = signal.windows.flattop(N)
-# Window normalization
-U = np.square(np.sum(win))
-
-# Window the data
-iq_win = iq * win
-
-# FFT size
-NFFT = 2**(N - 1).bit_length()
-
-# FFT
-IQ = np.fft.fft(iq_win, NFFT)
-IQ = np.fft.fftshift(IQ)
-
-# Move the Nyquist point to the right-hand side (pos freq) to be
-# consistent with plot when looking at the positive half only.
-IQ = np.concatenate((IQ[1:], IQ[0]), axis=None)
-
-# Frequency axis
-df = fs/NFFT
-f = np.arange(1, NFFT+1) * df - fs/2
+start = time.time()
+if welch_segment > 0:
+	with WelchPsd(fs, welch_segment, welch_overlap, 'flattop', threads=psd_threads) as psd:
+		f, Pxx = psd.process(iq, psd_block)
+	method = f'Welch PSD of {psd.count} segments'
+else:
+	f, Pxx = full_spectrum(iq, fs, psd_block)
+	method = f'Flattop FFT with {len(f)} bins'
+psd_time = time.time() - start
 f = f + freq
-
-# Power spectrum
-Pxx = np.real(IQ*np.conjugate(IQ))/U
+print(f'{method} of {len(iq)} samples in {psd_time:.3f} sec -> {len(iq) / psd_time / 1e6:.1f} MSa/s')
 
 # Convert to dBm (50 Ohm load assumed)
 Pxx = 10*np.log10(Pxx/50 * 1000)
@@ -0,0 +1,188 @@
+"""
+# GitHub examples repository path: VectorNetworkAnalyzers/Python/RsInstrument
+Created 2026/10
+
+Author:                     R&S Customer Support
+Version Number:             2
+Date of last change:        2026/10/18
+Requires:                   R&S ZNA, FW 2.90 or newer
+                            or R&S ZNB, FW 3.50 or newer
+                            or R&S ZVA, FW 4.11 or newer
+                            Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
+
+Description: Example of a pipelined measurement and readout of many sweeps.
+Like in RsInstrument_VNA_Fast_Sweep_and_Read.py, the completed sweeps are read while the VNA runs
+the next sweep, but:
+- The trace data is transferred in binary format (REAL,32) instead of ASCII.
+- The trace selection and the data query are sent in one message, one round trip per trace.
+- The end of the measurement is event driven: INIT;*OPC sets bit 0 (OPC) of the Event Status Register,
+  which is forwarded to bit 5 of the Status Byte with *ESE 1 and detected by a serial poll (read_stb).
+  The VNA sets no status event for the single sweeps of a SENS:SWE:COUN series, so the sweep counter
+  (CALC:DATA:NSW:COUN?) is still needed to find the completed sweeps. It is not queried in a loop:
+  the reader sleeps until the next sweep is due from the sweep time, then queries the counter once.
+- The sweeps are handed to a consumer thread through a ring buffer with a fixed number of
+  preallocated slots. If the consumer is too slow and no slot is free, the sweep is dropped and counted.
+  The memory stays constant for any number of sweeps.
+At the end, the sweeps/s rate and the number of dropped sweeps are printed.
+
+
+General Information:
+
+Please always check this example script for unsuitable setting that may
+destroy your DUT before connecting it to the instrument!
+This example does not claim to be complete. All information has been
+compiled with care. However, errors can not be ruled out.
+"""
+
+from RsInstrument import *
+import numpy as np
+import queue
+import threading
+import time
+
+# Define variables
+resource = 'TCPIP0::10.102.100.61::hislip0'  # VISA resource string for the device
+traces = ['Trc1', 'Trc2']  # Traces read for every sweep
+points = 201  # Sweep points
+sweep_count = 5000  # Number of sweeps
+ring_slots = 64  # Number of sweeps the ring buffer can hold
+
+# Make sure you have the last version of the RsInstrument
+RsInstrument.assert_minimum_version('1.24.0')
+
+# Define the device handle
+vna = RsInstrument(resource, reset=True, id_query=True,
+                   options="SelectVisa='rs' , LoggingMode = Off, LoggingToConsole = False")
+
+
+class SweepRingBuffer:
+    """Fixed number of preallocated slots for complex sweep data (sweep x trace x point)"""
+
+    def __init__(self, slots, trace_count, point_count):
+        self.data = np.zeros((slots, trace_count, point_count), dtype=np.complex64)
+        self.sweep_numbers = np.zeros(slots, dtype=np.int64)
+        self.free = queue.Queue()
+        self.filled = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.dropped = 0
+
+    def get_free_slot(self):
+        """Return a free slot number or None, if the consumer did not release any slot yet"""
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return None
+
+
+def com_prep():
+    """Preparation of the communication (termination, etc...)"""
+    print(f'VISA Manufacturer: {vna.visa_manufacturer}')  # Confirm VISA package to be chosen
+    vna.visa_timeout = 5000  # Timeout for VISA Read Operations
+    vna.opc_timeout = 600000  # Timeout for opc-synchronised operations, long enough for all sweeps
+    vna.instrument_status_checking = True  # Error check after each command, can be True or False
+    vna.clear_status()  # Clear status register
+
+
+def close():
+    """Close the VISA session"""
+    vna.close()
+
+
+def meas_setup():
+    """Prepare measurement setup"""
+    vna.write_str_with_opc("*RST")  # Reset
+    vna.write_str_with_opc(f"SWE:POIN {points}")
+    vna.write_str_with_opc("CALC:PAR:SDEF 'Trc1','A1'")  # Switch to wave a1
+    vna.write_str_with_opc("DISP:WIND:TRAC1:FEED 'Trc1'")  # Display the trace 1 in window 1
+    vna.write_str_with_opc("CALC:PAR:SDEF 'Trc2','B1'")  # Switch on trace 2 with wave b1
+    vna.write_str_with_opc("DISP:WIND:TRAC2:FEED 'Trc2'")  # Display the trace 2 in window 1
+    vna.write_str_with_opc("INIT:CONT OFF")  # Switch to single sweep
+    vna.write_str_with_opc(f"SENS:SWE:COUN {sweep_count}")
+    vna.write_str_with_opc("FORM:DATA REAL,32;:FORM:BORD SWAP")  # Binary data, little endian
+    print(vna.query_str_with_opc("Syst:ERR?"))  # Check for errors
+
+
+def read_sweep(ring, query):
+    """Read all traces of one sweep into a free ring buffer slot and hand it to the consumer"""
+    slot = ring.get_free_slot()
+    if slot is None:
+        return
+    for index, trace in enumerate(traces):
+        # Interleaved real and imaginary REAL,32 values are the memory layout of complex64
+        ring.data[slot, index] = np.frombuffer(vna.query_bin_block(f"CALC:PAR:SEL '{trace}';:{query}"),
+                                               dtype='<f4').view(np.complex64)
+    ring.filled.put(slot)
+
+
+def consumer(ring, results):
+    """Process the sweeps from the ring buffer, here: maximum magnitude in dB per trace"""
+    while True:
+        slot = ring.filled.get()
+        if slot is None:
+            break
+        max_db = 20 * np.log10(np.abs(ring.data[slot]).max(axis=1) + 1e-30)
+        results['sweeps'] += 1
+        results['max_db'] = np.maximum(results['max_db'], max_db)
+        ring.free.put(slot)
+
+
+def measurement():
+    ring = SweepRingBuffer(ring_slots, len(traces), points)
+    results = {'sweeps': 0, 'max_db': np.full(len(traces), -np.inf)}
+    consumer_thread = threading.Thread(target=consumer, args=(ring, results))
+    consumer_thread.start()
+
+    sweep_time = vna.query_float("SENS:SWE:TIME?")
+    vna.write_str("*ESE 1")  # Forward bit 0 (OPC) of the Event Status Register to bit 5 of the Status Byte
+    vna.query_int("*ESR?")  # Clear the Event Status Register
+    # No status check while the sweeps run, it is switched on again after the measurement
+    status_checking = vna.instrument_status_checking
+    vna.instrument_status_checking = False
+    session = vna.get_session_handle()
+    start = time.time()
+    vna.write_str("INIT;*OPC")  # Start the measurement, OPC is set after the last sweep
+    next_sweep = 1
+    while next_sweep < sweep_count and not session.read_stb() & 32:
+        # Sleep until the next sweep is due, then check once how far the VNA is
+        time.sleep(max(0.0, start + next_sweep * sweep_time - time.time()))
+        running = int(vna.query_str("CALC:DATA:NSW:COUN?"))  # actual sweep number
+        if running <= next_sweep:
+            time.sleep(sweep_time / 2)  # Behind the sweep time estimate, e.g. due to the retrace
+            continue
+        # All sweeps before the running one are complete
+        while next_sweep < min(running, sweep_count):
+            read_sweep(ring, f"CALC:DATA:NSW:FIRS? SDATA, {next_sweep}")
+            next_sweep += 1
+    while not session.read_stb() & 32:  # Wait for the last sweep
+        time.sleep(sweep_time / 2)
+    vna.query_int("*ESR?")
+    vna.instrument_status_checking = status_checking
+    # Sweeps not read yet, if the measurement ended before the reader caught up
+    while next_sweep < sweep_count:
+        read_sweep(ring, f"CALC:DATA:NSW:FIRS? SDATA, {next_sweep}")
+        next_sweep += 1
+    read_sweep(ring, "CALC:DATA:NSW:LAST? SDATA, 1")
+    elapsed = time.time() - start
+
+    ring.filled.put(None)
+    consumer_thread.join()
+    print(f'{sweep_count} sweeps in {elapsed:.2f} s -> {sweep_count / elapsed:.1f} sweeps/s, '
+          f'processed: {results["sweeps"]}, dropped: {ring.dropped}')
+    for trace, max_db in zip(traces, results['max_db']):
+        print(f'{trace}: maximum {max_db:.2f} dB')
+
+
+# ---------------------------
+# Main Program begins here
+# just calling the functions
+# ---------------------------
+
+com_prep()
+meas_setup()
+measurement()
+close()
+
+print("I'm done")
@@ -0,0 +1,254 @@
+"""
+# GitHub examples repository path: VectorNetworkAnalyzers/Python/RsInstrument
+
+Created 2026/10
+
+Author:                     R&S Customer Support
+Version Number:             2
+Date of last change:        2026/10/18
+Requires:                   R&S ZNB/ZNA, FW 3.12 or newer and adequate options
+                            Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
+
+Description:    Example of a post-processing stage for 2-port S-parameter readouts.
+                - The SDATa of all four S-parameters (CALCulate1:DATA:SGRoup? SDATa) is converted from
+                  interleaved real/imaginary values into complex numpy arrays (sweeps x points x 2 x 2).
+                - The fixtures on both sides are de-embedded by cascading transfer (T) matrices.
+                - The group delay of S21 and the limit checks of |S21| and |S11| are calculated.
+                All steps work on a batch of sweeps at once, there is no loop over the points.
+                Optionally, the batches are distributed over several processes (process_workers), with at most
+                two batches per process in flight.
+                Without instrument (use_instrument = False), random sweeps are processed to show the throughput.
+
+
+General Information:
+
+Please always check this example script for unsuitable setting that may
+destroy your DUT before connecting it to the instrument!
+This example does not claim to be complete. All information has been
+compiled with care. However, errors can not be ruled out.
+"""
+
+from RsInstrument import *
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import NamedTuple
+import numpy as np
+import time
+
+# Define variables
+resource = 'TCPIP0::10.205.0.51::hislip0'  # VISA resource string for the device
+use_instrument = False  # False: process random sweeps instead of measured ones
+points = 10001  # Sweep points
+sweep_count = 2000  # Number of sweeps
+batch_size = 50  # Sweeps processed together
+process_workers = 0  # Number of processes, 0: everything in this process
+fixture_a_file = None  # Touchstone file of the fixture on port 1 (fixture port 2 at the DUT), None: ideal thru
+fixture_b_file = None  # Touchstone file of the fixture on port 2 (fixture port 1 at the DUT), None: ideal thru
+s21_limits_db = (-1.0, 0.5)  # Lower and upper limit of |S21| / dB
+s11_max_db = -15.0  # Upper limit of |S11| / dB
+
+
+def sdata_to_complex(data, point_count, port_count=2):
+    """Interleaved real/imaginary values of an S-parameter group (S11, S12, ..., Snn, each over all points)
+    to a complex array (sweeps x points x ports x ports). data can be a list of floats or a numpy array
+    with any number of sweeps one after the other."""
+    values = np.asarray(data, dtype=np.float64).view(np.complex128)
+    return np.moveaxis(values.reshape(-1, port_count, port_count, point_count), -1, 1)
+
+
+def s_to_t(s):
+    """2-port S-parameters (... x 2 x 2) to transfer parameters, with (b1, a1) = T (a2, b2)"""
+    s11, s12, s21, s22 = s[..., 0, 0], s[..., 0, 1], s[..., 1, 0], s[..., 1, 1]
+    t = np.empty_like(s)
+    t[..., 0, 0] = (s12 * s21 - s11 * s22) / s21
+    t[..., 0, 1] = s11 / s21
+    t[..., 1, 0] = -s22 / s21
+    t[..., 1, 1] = 1 / s21
+    return t
+
+
+def t_to_s(t):
+    """Transfer parameters (... x 2 x 2) back to S-parameters"""
+    t11, t12, t21, t22 = t[..., 0, 0], t[..., 0, 1], t[..., 1, 0], t[..., 1, 1]
+    s = np.empty_like(t)
+    s[..., 0, 0] = t12 / t22
+    s[..., 0, 1] = (t11 * t22 - t12 * t21) / t22
+    s[..., 1, 0] = 1 / t22
+    s[..., 1, 1] = -t21 / t22
+    return s
+
+
+def matmul_2x2(a, b):
+    """Product of stacks of 2 x 2 matrices, element by element, which is faster than np.matmul for 2 x 2"""
+    c = np.empty(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+    c[..., 0, 0] = a[..., 0, 0] * b[..., 0, 0] + a[..., 0, 1] * b[..., 1, 0]
+    c[..., 0, 1] = a[..., 0, 0] * b[..., 0, 1] + a[..., 0, 1] * b[..., 1, 1]
+    c[..., 1, 0] = a[..., 1, 0] * b[..., 0, 0] + a[..., 1, 1] * b[..., 1, 0]
+    c[..., 1, 1] = a[..., 1, 0] * b[..., 0, 1] + a[..., 1, 1] * b[..., 1, 1]
+    return c
+
+
+def load_touchstone(file_path, freq):
+    """Read a 2-port Touchstone v1 file (RI, MA or DB format) and interpolate it onto the frequencies.
+    Returns the S-parameters (points x 2 x 2)"""
+    units = {'HZ': 1, 'KHZ': 1e3, 'MHZ': 1e6, 'GHZ': 1e9}
+    unit, data_format = 1e9, 'MA'
+    rows = []
+    with open(file_path) as file:
+        for line in file:
+            line = line.split('!')[0].strip()
+            if line.startswith('#'):
+                options = line[1:].upper().split()
+                unit = next((units[o] for o in options if o in units), unit)
+                data_format = next((o for o in options if o in ('RI', 'MA', 'DB')), data_format)
+            elif line and not line.startswith('['):
+                rows.extend(float(x) for x in line.split())
+    table = np.array(rows).reshape(-1, 9)
+    first, second = table[:, 1::2], table[:, 2::2]
+    if data_format == 'RI':
+        values = first + 1j * second
+    else:
+        magnitude = 10 ** (first / 20) if data_format == 'DB' else first
+        values = magnitude * np.exp(1j * np.deg2rad(second))
+    # Order in the file: S11, S21, S12, S22
+    values = np.column_stack([np.interp(freq, table[:, 0] * unit, v.real) + 1j * np.interp(freq, table[:, 0] * unit, v.imag)
+                              for v in values.T])
+    return values[:, [0, 2, 1, 3]].reshape(-1, 2, 2)
+
+
+class BatchResult(NamedTuple):
+    s_dut: np.ndarray  # De-embedded S-parameters (sweeps x points x 2 x 2)
+    group_delay: np.ndarray  # Group delay of S21 / s (sweeps x points)
+    passed: np.ndarray  # Limit check result per sweep
+    s21_margin: np.ndarray  # Smallest distance of |S21| to its limits per sweep / dB
+
+
+class PostProcessor:
+    """De-embedding, group delay and limit checks for batches of 2-port sweeps"""
+
+    def __init__(self, freq, fixture_a=None, fixture_b=None):
+        self.freq = freq
+        thru = np.zeros((len(freq), 2, 2), dtype=np.complex128)
+        thru[:, 0, 1] = thru[:, 1, 0] = 1
+        # The inverse T matrices of the fixtures are calculated once
+        self.inv_ta = np.linalg.inv(s_to_t(thru if fixture_a is None else fixture_a))
+        self.inv_tb = np.linalg.inv(s_to_t(thru if fixture_b is None else fixture_b))
+        self.omega = 2 * np.pi * freq
+
+    def deembed(self, s_meas):
+        """Remove the fixtures from the measured S-parameters (sweeps x points x 2 x 2)"""
+        return t_to_s(matmul_2x2(matmul_2x2(self.inv_ta, s_to_t(s_meas)), self.inv_tb))
+
+    def group_delay(self, s21):
+        """Group delay -d(phase)/d(omega) of S21 (sweeps x points)"""
+        return -np.gradient(np.unwrap(np.angle(s21), axis=-1), self.omega, axis=-1)
+
+    def process(self, s_meas):
+        s_dut = self.deembed(s_meas)
+        s21_db = 20 * np.log10(np.abs(s_dut[..., 1, 0]))
+        s11_db = 20 * np.log10(np.abs(s_dut[..., 0, 0]))
+        s21_margin = np.minimum(s21_db - s21_limits_db[0], s21_limits_db[1] - s21_db).min(axis=-1)
+        passed = (s21_margin >= 0) & (s11_db.max(axis=-1) <= s11_max_db)
+        return BatchResult(s_dut, self.group_delay(s_dut[..., 1, 0]), passed, s21_margin)
+
+
+# Post processor of a worker process, set by the initializer of the process pool
+worker_processor = None
+
+
+def init_worker(processor):
+    global worker_processor
+    worker_processor = processor
+
+
+def process_in_worker(s_meas):
+    """Process one batch in a worker process. Only the limit results are sent back,
+    to keep the data transfer between the processes small."""
+    result = worker_processor.process(s_meas)
+    return result.passed, result.s21_margin
+
+
+def bounded_map(pool, function, items, window):
+    """Like pool.map, but with at most window items in flight and the results in completion order.
+    The next item is only taken from the generator when a result is done, so the memory stays bounded
+    and the acquisition of the next batch overlaps with the processing."""
+    pending = set()
+    for item in items:
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(pool.submit(function, item))
+    for future in pending:
+        yield future.result()
+
+
+def random_batches(freq):
+    """Random 2-port sweeps as replacement for the instrument data"""
+    rng = np.random.default_rng(1)
+    delay = np.exp(-2j * np.pi * freq * 1e-9)
+    for first in range(0, sweep_count, batch_size):
+        count = min(batch_size, sweep_count - first)
+        s = 0.01 * (rng.standard_normal((count, len(freq), 2, 2)) + 1j * rng.standard_normal((count, len(freq), 2, 2)))
+        s[..., 0, 1] += 0.95 * delay
+        s[..., 1, 0] += 0.95 * delay
+        yield s
+
+
+def instrument_batches(vna, freq):
+    """Measure the sweeps and read all four S-parameters of a sweep with one binary transfer"""
+    for first in range(0, sweep_count, batch_size):
+        count = min(batch_size, sweep_count - first)
+        # A new array per batch, the process pool may still hold the previous one
+        batch = np.empty((count, len(freq), 2, 2), dtype=np.complex128)
+        for row in range(count):
+            vna.write_str_with_opc('INITiate1:IMMediate')
+            data = np.frombuffer(vna.query_bin_block('CALCulate1:DATA:SGRoup? SDATa'), dtype='<f8')
+            batch[row] = sdata_to_complex(data, len(freq))[0]
+        yield batch
+
+
+def main():
+    vna = None
+    if use_instrument:
+        vna = RsInstrument(resource, True, True, "SelectVisa='rs'")
+        vna.visa_timeout = 10000  # Timeout for VISA Read Operations
+        vna.opc_timeout = 20000  # Timeout for opc-synchronised operations
+        vna.instrument_status_checking = True  # Error check after each command, can be True or False
+        vna.write_str_with_opc(f'INITiate1:CONTinuous OFF;:SENSe1:SWEep:POINts {points}')
+        vna.write_str_with_opc('CALCulate1:PARameter:DEFine:SGRoup 1, 2')  # S11, S12, S21, S22 in one group
+        vna.write_str_with_opc('FORMat:DATA REAL,64;:FORMat:BORDer SWAPped')  # Binary data, little endian
+        freq = np.frombuffer(vna.query_bin_block('CALCulate1:DATA:STIMulus?'), dtype='<f8')
+        batches = instrument_batches(vna, freq)
+    else:
+        freq = np.linspace(10e6, 10e9, points)
+        batches = random_batches(freq)
+
+    fixture_a = load_touchstone(fixture_a_file, freq) if fixture_a_file else None
+    fixture_b = load_touchstone(fixture_b_file, freq) if fixture_b_file else None
+    processor = PostProcessor(freq, fixture_a, fixture_b)
+
+    start = time.time()
+    passed = 0
+    worst_margin = np.inf
+    if process_workers > 0:
+        with ProcessPoolExecutor(max_workers=process_workers, initializer=init_worker,
+                                 initargs=(processor,)) as pool:
+            for batch_passed, margin in bounded_map(pool, process_in_worker, batches, 2 * process_workers):
+                passed += int(np.count_nonzero(batch_passed))
+                worst_margin = min(worst_margin, margin.min())
+    else:
+        for batch in batches:
+            result = processor.process(batch)
+            passed += int(np.count_nonzero(result.passed))
+            worst_margin = min(worst_margin, result.s21_margin.min())
+    elapsed = time.time() - start
+
+    print(f'{sweep_count} sweeps with {points} points in {elapsed:.1f} s -> {sweep_count / elapsed * 60:.0f} sweeps/min')
+    print(f'Passed: {passed}, failed: {sweep_count - passed}, worst |S21| margin: {worst_margin:.2f} dB')
+    if vna is not None:
+        vna.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,18 @@
 Created 2022/06
 
 Author:                     Jahns_P
-Version Number:             2
-Date of last change:        2022/06/07
+Version Number:             3
+Date of last change:        2026/10/18
 Requires:                   R&S zna, FW 3.40 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
 
 Description: Example for remote calibration including power calibration using an external auto-cal unit and power meter.
+The calibration steps run in a CalibrationOrchestrator. Every step goes through the states
+PROMPT (operator connects the hardware) -> RUNNING -> DONE or FAILED.
+A running step is not waited for with a long VISA timeout: the command is sent with *OPC and the
+Event Status Bit of the Status Byte is polled with a serial poll, which the instrument answers while it is busy.
+Between the polls, the host reports the progress and can do other work.
+At the end, the durations of the steps (operator and instrument time) are printed.
 
 
 General Information:
@@ -20,7 +26,7 @@ compiled with care. However, errors can not be ruled out.
 """
 
 from RsInstrument import *
-from time import sleep
+from time import sleep, time
 
 # Define variables
 resource = 'TCPIP0::10.205.0.60::INSTR'  # VISA resource string for the device
@@ -70,10 +76,10 @@ def meassetup():
     """Prepare measurement setup"""
     # RF Setup first
     zna.write_str_with_opc('SYSTEM:DISPLAY:UPDATE ON')  # Be sure to have the display updated whilst remote control
-    zna.write_str_with_opc('SENSe1:FREQuency:Start 1e9')  # Set start frequency to 1 GHz
-    zna.write_str_with_opc('SENSe1:FREQuency:Stop 2e9')  # Set stop frequency to 2 GHz
-    zna.write_str_with_opc('SENSe1:SWEep:POINts 501')  # Set number of sweep points
-    zna.write_str_with_opc('CALCulate1:PARameter:MEAsure "Trc1", "S11"')  # Change active trace to S11 measurement
+    zna.write_str('SENSe1:FREQuency:Start 1e9;'  # Set start frequency to 1 GHz
+                  ':SENSe1:FREQuency:Stop 2e9;'  # Set stop frequency to 2 GHz
+                  ':SENSe1:SWEep:POINts 501')  # Set number of sweep points
+    zna.write_str('CALCulate1:PARameter:MEAsure "Trc1", "S11"')  # Change active trace to S11 measurement
 
     zna.write_str('CALCulate1:PARameter:SDEFine "Ch1Tr2", "S21"')  # Define 2nd trace (S21) in 1st window / CH1
     zna.write_str('DISPlay:WINDow1:TRACe2:FEED "CH1TR2"')  # Display the new trace
@@ -85,70 +91,144 @@ def meassetup():
     zna.write_str('CALCulate2:PARameter:SDEFine "Ch2Tr2", "S12"')  # Define 2nd trace (S12) in 2nd window / CH2
     zna.write_str('DISPlay:WINDow2:TRACe2:FEED "CH2TR2"')  # Display the new trace
 
-    zna.query_opc()  # check for command completion at the end of the command row
+    zna.query_opc()  # check for command completion at the end of the command row, the display is ready then
 
-    sleep(1)  # wait for the display to be ready
     zna.write_str_with_opc('DISPlay:WINDow1:TRACe2:Y:SCALe:AUTO ONCE')  # Auto scale trace 2 in 1st window
     zna.write_str('INIT1:CONTinuous OFF')  # Initiate a single sweep for CH1 in window 1
     zna.write_str('INIT2:CONTinuous OFF')  # And do the same for the 2nd window / channel
 
 
-def powcal():
-    zna.write('SOURce1:POWer1:CORRection:COLLect:FLATness 1')  # Enables the source power calibration
-    zna.write('SOURce1:POWer1:CORRection:COLLect:RRECeiver 1')  # Enable Reference receiver calibration together
-    #                                                             with the source power calibration
-    zna.visa_timeout = 30000  # Change timeouts as zna will take more than 15 - 20 seconds for the next operation
-    zna.opc_timeout = 30000
-
-    zna.write('SOURce1:POWer1:CORRection:PSELect PPOWer')  # Defines how to define the source power the R&S ZNA uses to
-    #                                                        perform the first calibration sweep of the source power
-    #                                                        calibration (Reference Receiver Cal Power).
-    zna.write('SOURce1:POWer1:CORRection:PPOWer -10')  # Defines the source power the R&S ZNA uses to perform the first
-    #                                                    calibration sweep of the source power calibration
-    zna.write('SOURce:POWer:CORRection:COLLect:AVERage:NTOLerance 0.05 ')  # Set a tolerance level for power cal
-
-    print('\n Please connect the power meter to port 1 and confirm')
-    _ = input()
-    zna.write('SOURce1:POWer1:CORRection:ACQuire Port,1')  # Perform a complete power calibration on port 1
-    # And check the calibration result concerning success and max. deviation
-    print(zna.query_str('SOURce1:POWer1:CORRection:ACQuire:VERification:RESult?'))
-
-    zna.write('SOURce2:POWer2:CORRection:PSELect PPOWer')  # Defines how to define the source power the R&S ZNA uses to
-    #                                                        perform the first calibration sweep of the source power
-    #                                                        calibration (Reference Receiver Cal Power).
-    zna.write('SOURce2:POWer2:CORRection:PPOWer -10')  # Defines the source power the R&S ZNA uses to perform the first
-    #                                                    calibration sweep of the source power calibration
-
-    print('\n Please change the power meter to port 2 now and confirm')
-    _ = input()
-    zna.write('SOURce2:POWer2:CORRection:ACQuire Port,2')  # Perform a complete power calibration on port 1
-    # And check the calibration result concerning success and max. deviation
-    print(zna.query_str('SOURce2:POWer2:CORRection:ACQuire:VERification:RESult?'))
-
-    zna.opc_timeout = 5000  # Change back timeouts to standard values
-    zna.visa_timeout = 5000
-
-
-def cal():
-    print('\n Please connect both ports to the adequate connectors of the cal unit and confirm')
-    _ = input()
-    zna.opc_timeout = 15000  # The calibration will take more than the 5 seconds of OPC timeout that is set as standard
-    print('Now starting automatic calibration')
-    zna.write_str_with_opc('SENSe1:CORRection:COLLect:AUTO:TYPE FNPort," ",1,2')  # Perform auto calibration using UOSM
+class CalibrationStep:
+    """One calibration step: operator prompt, setup commands, the command to run and the result query"""
+
+    def __init__(self, name, command, prompt=None, setup=(), result_query=None, timeout=60):
+        self.name = name
+        self.command = command
+        self.prompt = prompt
+        self.setup = list(setup)
+        self.result_query = result_query
+        self.timeout = timeout
+        self.state = 'PENDING'
+        self.result = None
+        self.operator_time = 0
+        self.instrument_time = 0
+
+
+class CalibrationOrchestrator:
+    """Runs the calibration steps one after the other as a state machine.
+    The end of a running step is detected with the Status Byte (bit 5, Event Status Bit, set by *OPC)."""
+
+    def __init__(self, instr, steps, host_work=None, min_wait=0.05, max_wait=1.0):
+        self.instr = instr
+        self.steps = steps
+        self.host_work = host_work  # Called between the status polls with (step, elapsed time)
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+
+    def operation_complete(self):
+        """Serial poll of the Status Byte, also answered while the instrument is busy"""
+        try:
+            return self.instr.get_session_handle().read_stb() & 32 != 0
+        except (AttributeError, NotImplementedError):
+            # Sessions without serial poll (e.g. SelectVisa='socket'): query the Event Status Register
+            return self.instr.query_int('*ESR?') & 1 != 0
+
+    def run_step(self, step):
+        if step.prompt:
+            step.state = 'PROMPT'
+            start = time()
+            print(f'\n {step.prompt} and confirm')
+            _ = input()
+            step.operator_time = time() - start
+        step.state = 'RUNNING'
+        start = time()
+        if step.setup:
+            self.instr.write_str(';:'.join(step.setup))
+        self.instr.write_str('*ESE 1')  # Forward bit 0 (OPC) of the Event Status Register to bit 5 of the Status Byte
+        self.instr.query_int('*ESR?')  # Clear the Event Status Register
+        # The error check after the write would wait for the end of the step, it is done after the step
+        status_checking = self.instr.instrument_status_checking
+        self.instr.instrument_status_checking = False
+        try:
+            self.instr.write_str(f'{step.command};*OPC')
+            wait = self.min_wait
+            while not self.operation_complete():
+                elapsed = time() - start
+                if elapsed > step.timeout:
+                    step.state = 'FAILED'
+                    raise TimeoutError(f'{step.name} not complete after {step.timeout} s')
+                if self.host_work:
+                    self.host_work(step, elapsed)
+                sleep(wait)
+                wait = min(wait * 2, self.max_wait)
+        finally:
+            self.instr.instrument_status_checking = status_checking
+        # Clear the Event Status Register and with it the Status Byte bit, the error check is done with this query
+        self.instr.query_int('*ESR?')
+        if step.result_query:
+            step.result = self.instr.query_str(step.result_query)
+        step.instrument_time = time() - start
+        step.state = 'DONE'
+        print(f'\r{step.name} done in {step.instrument_time:.1f} s' + (f': {step.result}' if step.result else ''))
+
+    def run(self):
+        try:
+            for step in self.steps:
+                self.run_step(step)
+        finally:
+            self.report()
+
+    def report(self):
+        """Print the durations of all steps"""
+        print(f'\n{"Step":<30}{"State":<10}{"Operator / s":>14}{"Instrument / s":>16}')
+        for step in self.steps:
+            print(f'{step.name:<30}{step.state:<10}{step.operator_time:>14.1f}{step.instrument_time:>16.1f}')
+        print(f'{"Total":<40}{sum(step.operator_time for step in self.steps):>14.1f}'
+              f'{sum(step.instrument_time for step in self.steps):>16.1f}')
+
+
+def powcal_steps():
+    """Source power calibration of port 1 and 2 with power meter"""
+    steps = []
+    for port in (1, 2):
+        setup = [f'SOURce{port}:POWer{port}:CORRection:PSELect PPOWer',  # Defines how to define the source power the
+                 # R&S ZNA uses to perform the first calibration sweep of the source power calibration
+                 # (Reference Receiver Cal Power)
+                 f'SOURce{port}:POWer{port}:CORRection:PPOWer -10']  # Source power of the first calibration sweep
+        if port == 1:
+            setup = ['SOURce1:POWer1:CORRection:COLLect:FLATness 1',  # Enables the source power calibration
+                     'SOURce1:POWer1:CORRection:COLLect:RRECeiver 1',  # Enable Reference receiver calibration together
+                     # with the source power calibration
+                     'SOURce:POWer:CORRection:COLLect:AVERage:NTOLerance 0.05'] + setup  # Tolerance level for power cal
+        steps.append(CalibrationStep(f'Power calibration port {port}',
+                                     f'SOURce{port}:POWer{port}:CORRection:ACQuire Port,{port}',
+                                     prompt=f'Please connect the power meter to port {port}',
+                                     setup=setup,
+                                     # Check the calibration result concerning success and max. deviation
+                                     result_query=f'SOURce{port}:POWer{port}:CORRection:ACQuire:VERification:RESult?',
+                                     timeout=60))
+    return steps
+
+
+def cal_steps():
+    """Automatic calibration with the cal unit and saving of the calibration"""
     # Information (copied from the ZNA manual):
     # --> TOSM
     # Full n-port calibration with characterized Through.
     # If the selected cal unit characterization does not contain a Through characterization, the command silently falls
     # back to a FNPort (UOSM) calibration.
-    print('Automatic calibration is done')
-    zna.opc_timeout = 5000  # Set back OPC timeout to standard
+    return [CalibrationStep('Automatic calibration UOSM',
+                            'SENSe1:CORRection:COLLect:AUTO:TYPE FNPort," ",1,2',
+                            prompt='Please connect both ports to the adequate connectors of the cal unit',
+                            timeout=60),
+            CalibrationStep('Save calibration', 'MMEMORY:STORE:CORRection 1, "AUTOCAL.cal"', timeout=10),
+            # And reload it (just to show the command)
+            CalibrationStep('Reload calibration', 'MMEMORY:LOAD:CORRection 1, "AUTOCAL.cal"', timeout=10)]
 
 
-def savecal():
-    """Apply calibration after it is finished and save the calibration file"""
-    sleep(2)
-    zna.write_str_with_opc('MMEMORY:STORE:CORRection 1, "AUTOCAL.cal"')  # Save current calibration
-    zna.write_str_with_opc('MMEMORY:LOAD:CORRection 1, "AUTOCAL.cal"')  # And reload it (just to show the command)
+def show_progress(step, elapsed):
+    """Host work between the status polls, here only a progress message"""
+    print(f'\r{step.name}: running for {elapsed:.0f} s', end='')
 
 
 # ---------------------------
@@ -159,9 +239,7 @@ def savecal():
 comprep()
 comcheck()
 meassetup()
-powcal()
-cal()
-savecal()
+CalibrationOrchestrator(zna, powcal_steps() + cal_steps(), host_work=show_progress).run()
 close()
 
 print("I'm done")
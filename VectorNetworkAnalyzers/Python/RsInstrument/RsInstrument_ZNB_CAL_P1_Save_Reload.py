@@ -4,12 +4,17 @@
 Created 2021/05
 
 Author:                     Jahns_P
-Version Number:             1
-Date of last change:        2021/05/28
+Version Number:             3
+Date of last change:        2026/10/18
 Requires:                   R&S ZNB, FW 3.12 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
 
 Description:    Example for remote calibration with robot support to feed the calibration elements.
+                The calibration steps are synchronized by a serial poll of the Status Byte (*ESE 1, *OPC)
+                instead of fixed waiting times.
+                A CalibrationManager keeps a local index of the cal pool entries (name, frequency range, points, date),
+                loads a calibration only into the channels which do not have it yet and sends the loads for all
+                channels in one SCPI message.
 
 
 General Information:
@@ -21,10 +26,18 @@ compiled with care. However, errors can not be ruled out.
 """
 
 from RsInstrument import *
-from time import sleep
+from time import sleep, time
+from datetime import datetime
+import json
+import os
 
 # Define variables
 resource = 'TCPIP::10.205.0.51::hislip0'  # VISA resource string for the device
+cal_name = 'P1_OSM_1-2GHz'  # Name of the calibration in the pool
+cal_pool_path = r'C:\Users\Public\Documents\Rohde-Schwarz\Vna\Calibration\Data'  # Cal pool directory on the instrument
+cal_timeout = 60  # Maximum time in seconds for one calibration sweep
+# Local index of the cal pool entries, per instrument
+CAL_INDEX_FILE = os.path.join(os.path.expanduser('~'), 'RsInstrument_ZNB_cal_pool_index.json')
 
 # Define the device handle
 # Instrument = RsInstrument(resource)
@@ -68,6 +81,112 @@ def comcheck():
     print('Hello, I am ' + idnResponse)
 
 
+def wait_for_operation_complete(timeout, min_wait=0.01, max_wait=0.5):
+    """Wait for bit 5 (Event Status Bit) of the Status Byte, set by *OPC with *ESE 1.
+    The serial poll is also answered while the calibration sweep runs, unlike a query.
+    The wait time between the polls is doubled up to max_wait."""
+    session = Instrument.get_session_handle()
+    wait = min_wait
+    deadline = time() + timeout
+    while not session.read_stb() & 32:
+        if time() > deadline:
+            raise TimeoutError(f'Operation not complete after {timeout} s')
+        sleep(wait)
+        wait = min(wait * 2, max_wait)
+
+
+def acquire(standard, port=1):
+    """Measure one calibration standard and wait until the calibration sweep is complete"""
+    Instrument.write_str('*ESE 1')  # Forward bit 0 (OPC) of the Event Status Register to bit 5 of the Status Byte
+    Instrument.query_int('*ESR?')  # Clear the Event Status Register
+    # No status check while the calibration sweep runs, it would block until the sweep is done
+    status_checking = Instrument.instrument_status_checking
+    Instrument.instrument_status_checking = False
+    try:
+        Instrument.write_str(f'SENSe1:CORRection:COLLect:ACQuire:SELected {standard}, {port};*OPC')
+        wait_for_operation_complete(cal_timeout)
+    finally:
+        Instrument.instrument_status_checking = status_checking
+    # Clear the Event Status Register and with it the Status Byte bit, the error check is done with this query
+    Instrument.query_int('*ESR?')
+
+
+class CalibrationManager:
+    """Local index of the cal pool entries, loads calibrations into the channels which do not have them yet.
+    The index is stored per instrument (serial number) in CAL_INDEX_FILE."""
+
+    def __init__(self, instr):
+        self.instr = instr
+        self.key = f'{instr.full_instrument_model_name} {instr.instrument_serial_number}'
+        self.index = {}
+        if os.path.exists(CAL_INDEX_FILE):
+            with open(CAL_INDEX_FILE) as file:
+                self.index = json.load(file).get(self.key, {})
+
+    def save_index(self):
+        indexes = {}
+        if os.path.exists(CAL_INDEX_FILE):
+            with open(CAL_INDEX_FILE) as file:
+                indexes = json.load(file)
+        indexes[self.key] = self.index
+        with open(CAL_INDEX_FILE, 'w') as file:
+            json.dump(indexes, file, indent=2)
+
+    def sweep_settings(self, channels):
+        """Return {channel: (start, stop, points)} of the channels, read with one query"""
+        query = ';:'.join(f'SENSe{ch}:FREQuency:STARt?;:SENSe{ch}:FREQuency:STOP?;:SENSe{ch}:SWEep:POINts?'
+                          for ch in channels)
+        values = [float(x) for x in self.instr.query_str(query).split(';')]
+        return {ch: (values[3 * i], values[3 * i + 1], int(values[3 * i + 2])) for i, ch in enumerate(channels)}
+
+    def refresh(self):
+        """Remove the index entries which are not in the cal pool of the instrument anymore"""
+        catalog = self.instr.query_str(f"MMEMory:CATalog? '{cal_pool_path}'").replace('"', '').split(',')
+        pool = {os.path.splitext(name)[0] for name in catalog if name.lower().endswith('.cal')}
+        self.index = {name: entry for name, entry in self.index.items() if name in pool}
+        self.save_index()
+        return sorted(pool)
+
+    def store(self, channel, name):
+        """Save the calibration of the channel to the pool and add it to the index"""
+        self.instr.write_str_with_opc(f'MMEMory:STORe:CORRection {channel},"{name}"')
+        start, stop, points = self.sweep_settings([channel])[channel]
+        self.index[name] = {'start': start, 'stop': stop, 'points': points,
+                            'date': datetime.now().isoformat(timespec='seconds')}
+        self.save_index()
+
+    def active_calibrations(self, channels):
+        """Return {channel: cal set name} of the channels with the correction switched on, read with one query.
+        The instrument is asked, so the result is also valid after a preset."""
+        query = ';:'.join(f'SENSe{ch}:CORRection:CSET:ACTive?;:SENSe{ch}:CORRection:STATe?' for ch in channels)
+        values = self.instr.query_str(query).split(';')
+        active = {}
+        for i, ch in enumerate(channels):
+            if values[2 * i + 1].strip() in ('1', 'ON'):
+                # The name may be returned with path and extension
+                name = os.path.splitext(os.path.basename(values[2 * i].strip().strip('\'"').replace('\\', '/')))[0]
+                active[ch] = name
+        return active
+
+    def apply(self, name, channels):
+        """Load the calibration into all channels which do not have it yet, with one SCPI message.
+        Returns the list of channels the calibration was loaded into."""
+        entry = self.index.get(name)
+        if entry is not None:
+            for ch, (start, stop, points) in self.sweep_settings(channels).items():
+                if start < entry['start'] or stop > entry['stop'] or points != entry['points']:
+                    print(f'Warning: CH{ch} sweep {start:.0f}...{stop:.0f} Hz, {points} points differs from '
+                          f'calibration {name} ({entry["start"]:.0f}...{entry["stop"]:.0f} Hz, {entry["points"]} points), '
+                          f'the calibration is interpolated')
+        # Skip the channels with the calibration already active
+        active = self.active_calibrations(channels)
+        to_load = [ch for ch in channels if active.get(ch, '').lower() != name.lower()]
+        if to_load:
+            self.instr.write_str(';:'.join(f'MMEMory:LOAD:CORRection {ch},"{name}"' for ch in to_load))
+            self.instr.query_opc()
+        return to_load
+
+
 def meassetup():
     """Prepare measurement setup and define calkit"""
     # RF Setup first
@@ -88,35 +207,34 @@ def calopen():
     print()
     print('Please connect OPEN to port 1 and confirm')
     _ = input()
-    Instrument.write_str_with_opc('SENSe1:CORRection:COLLect:ACQuire:SELected OPEN, 1')
+    acquire('OPEN')
 
 
 def calshort():
     """Perform calibration with short element"""
     print('Please connect SHORT to port 1 and confirm')
     _ = input()
-    Instrument.write_str_with_opc('SENSe1:CORRection:COLLect:ACQuire:SELected SHORT, 1')
+    acquire('SHORT')
 
 
 def calmatch():
     """Perform calibration with matched element"""
     print('Please connect MATCH to port 1 and confirm')
     _ = input()
-    Instrument.write_str_with_opc('SENSe1:CORRection:COLLect:ACQuire:SELected MATCH, 1')
+    acquire('MATCH')
 
 
 def applycal():
     """Apply calibration after it is finished and save the calfile"""
-    sleep(2)
     Instrument.write_str_with_opc('SENSe1:CORRection:COLLect:SAVE:SELected')
     #Instrument.write_str_with_opc('MMEMORY:STORE:CORRection 1, "NEWCAL.cal"')
     #Instrument.write_str_with_opc('MMEMORY:LOAD:CORRection 1, "NEWCAL.cal"')
 
 
-def savecal():
+def savecal(manager):
     """Save the calibration file to the pool"""
     print('Now saving the calibration to the pool')
-    Instrument.write('MMEMory:STORE:CORRection 1,"P1_OSM_1-2GHz"')
+    manager.store(1, cal_name)
 
 
 def loadprep():
@@ -124,45 +242,32 @@ def loadprep():
     print()
     print('Resetting the instrument, assign three channels with adequate settings')
     Instrument.write_str_with_opc('*RST')  # Perform a reset
-    #
-    # Prepare CH1 and trace 1 (CH, window and trace already existing as it is the 1st one)
-    #
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc('SENSe1:FREQuency:Start 1e9')  # Set start frequency to 1 GHz
-    Instrument.write_str_with_opc('SENSe1:FREQuency:Stop 2e9')  # Set stop frequency to 2 GHz
-    Instrument.write_str_with_opc('SENSe1:SWEep:POINts 501')  # Set number of sweep points
-
-    #
-    # Prepare CH2 and trace 2
-    #
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc("CALCULATE2:PARAMETER:SDEFINE 'Trc2', 'S11'")
-    Instrument.write_str_with_opc("CALCULATE2:PARAMETER:SELECT 'Trc2'")
-    Instrument.write_str_with_opc("DISPLAY:WINDOW2:STATE ON")
-    Instrument.write_str_with_opc("DISPLAY:WINDOW2:TRACE1:FEED 'Trc2'")
-    Instrument.write_str_with_opc('SENSe2:FREQuency:Start 1e9')  # Set start frequency to 1 GHz
-    Instrument.write_str_with_opc('SENSe2:FREQuency:Stop 2e9')  # Set stop frequency to 2 GHz
-    Instrument.write_str_with_opc('SENSe2:SWEep:POINts 501')  # Set number of sweep points
-    #
-    # Prepare CH3 and trace 3
-    #
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc("CALCULATE3:PARAMETER:SDEFINE 'Trc3', 'S11'")
-    Instrument.write_str_with_opc("CALCULATE3:PARAMETER:SELECT 'Trc3'")
-    Instrument.write_str_with_opc("DISPLAY:WINDOW3:STATE ON")
-    Instrument.write_str_with_opc("DISPLAY:WINDOW3:TRACE1:FEED 'Trc3'")
-    Instrument.write_str_with_opc('SENSe3:FREQuency:Start 1e9')  # Set start frequency to 1 GHz
-    Instrument.write_str_with_opc('SENSe3:FREQuency:Stop 2e9')  # Set stop frequency to 2 GHz
-    Instrument.write_str_with_opc('SENSe3:SWEep:POINts 501')  # Set number of sweep points
-
-
-def loadcal():
+    commands = []
+    for ch in (1, 2, 3):
+        if ch > 1:
+            # CH1, window 1 and trace 1 are already existing as it is the 1st one
+            commands += [f"CALCULATE{ch}:PARAMETER:SDEFINE 'Trc{ch}', 'S11'",
+                         f"CALCULATE{ch}:PARAMETER:SELECT 'Trc{ch}'",
+                         f"DISPLAY:WINDOW{ch}:STATE ON",
+                         f"DISPLAY:WINDOW{ch}:TRACE1:FEED 'Trc{ch}'"]
+        # Using the complete command including "SENSe" will define the channel the changes will be associated to
+        commands += [f'SENSe{ch}:FREQuency:Start 1e9',  # Set start frequency to 1 GHz
+                     f'SENSe{ch}:FREQuency:Stop 2e9',  # Set stop frequency to 2 GHz
+                     f'SENSe{ch}:SWEep:POINts 501']  # Set number of sweep points
+    # All settings in one message and one synchronization instead of one per command
+    Instrument.write_str(';:'.join(commands))
+    Instrument.query_opc()
+
+
+def loadcal(manager):
     """Now load the cal file to each channel"""
     print()
     print('Load the calibration to all three channels')
-    Instrument.write('MMEMory:LOAD:CORRection 1,"P1_OSM_1-2GHz"')
-    Instrument.write('MMEMory:LOAD:CORRection 2,"P1_OSM_1-2GHz"')
-    Instrument.write('MMEMory:LOAD:CORRection 3,"P1_OSM_1-2GHz"')
+    start = time()
+    loaded = manager.apply(cal_name, [1, 2, 3])
+    print(f'Calibration loaded into channels {loaded} in {time() - start:.2f} s')
+    # A second call does not load the calibration again
+    print(f'Channels loaded again: {manager.apply(cal_name, [1, 2, 3])}')
     # Instrument.write_str('SENSe1:CORRection:DELete')    # Command to remove the user calibration from CH1 if desired for RF debugging purposes
 
 #
@@ -174,14 +279,16 @@ def loadcal():
 
 comprep()
 comcheck()
+cal_manager = CalibrationManager(Instrument)
+print(f'Calibrations in the pool: {cal_manager.refresh()}')
 meassetup()
 calopen()
 calshort()
 calmatch()
 applycal()
-savecal()
+savecal(cal_manager)
 loadprep()
-loadcal()
+loadcal(cal_manager)
 close()
 
 print()
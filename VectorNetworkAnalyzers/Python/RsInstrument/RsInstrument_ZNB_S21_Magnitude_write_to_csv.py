@@ -4,12 +4,15 @@
 Created 2022/02
 
 Author:                     Jahns_P
-Version Number:             1
-Date of last change:        2022/02/17
+Version Number:             2
+Date of last change:        2026/10/18
 Requires:                   R&S ZNB, FW 3.12 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
 
 Description:    Example to measure S21 attenuation and write the results into a CSV file.
+                Stimulus and trace are read in binary format (REAL,64) and written with one numpy call.
+                With append_mode, several sweeps are logged with a timestamp into one growing file.
 
 
 General Information:
@@ -21,12 +24,16 @@ compiled with care. However, errors can not be ruled out.
 """
 
 from RsInstrument import *
-from time import sleep
+import os
+from time import sleep, time
+import numpy as np
 
 # Define variables
 resource = 'TCPIP0::10.205.0.51::INSTR'  # VISA resource string for the device
 PcFile = r'c:\tempdata\logfile.CSV'  # Name and path of the logfile
 points = 401  # Number of sweep points
+sweeps = 10  # Number of sweeps to be logged in append_mode
+append_mode = False  # True: append the sweeps with a timestamp to the existing logfile
 
 # Define the device handle
 # znb = RsInstrument(resource)
@@ -86,24 +93,25 @@ def meas_setup():
 
 
 def file_write():
-    # open logfile
-    logfile = open(PcFile, "w")
-    # write table headline
-    logfile.write("Frequ / Hz; Atten. / db")
-    logfile.write("\n")
-    points_count = znb.query_int('SENSe1:SWEep:POINts?')  # Request number of frequency points
-    trace_data = znb.query_str('CALC1:DATA? FDAT')  # Get measurement values for complete trace
-    trace_tup = tuple(map(str, trace_data.split(',')))  # Convert the received string into a tuple
-    freq_list = znb.query_str('CALC:DATA:STIM?')  # Get frequency list for complete trace
-    freq_tup = tuple(map(str, freq_list.split(',')))  # Convert the received string into a tuple
-
-    # Now write frequency and magnitude for each point and close the file if done
-    x = 0
-    while x < points:
-        logfile.write(freq_tup[x] + ";")
-        logfile.write(trace_tup[x] + "\n")
-        x = x + 1
-    logfile.close()
+    """Read trace data in binary format and write it into a local file"""
+    znb.write_str('FORMat:DATA REAL,64;:FORMat:BORDer SWAPped')  # Binary data, little endian
+    freq = np.frombuffer(znb.query_bin_block('CALCulate1:DATA:STIMulus?'), dtype='<f8')  # Frequency list
+    new_file = not append_mode or not os.path.exists(PcFile) or os.path.getsize(PcFile) == 0
+    with open(PcFile, 'a' if append_mode else 'w') as logfile:
+        if new_file:
+            # Write table headline
+            logfile.write("Time / s; Frequ / Hz; Atten. / db\n" if append_mode else "Frequ / Hz; Atten. / db\n")
+        for sweep in range(sweeps if append_mode else 1):
+            if append_mode:
+                znb.write_str_with_opc('INITiate1:IMMediate')  # Perform a new sweep
+            timestamp = time()
+            trace = np.frombuffer(znb.query_bin_block('CALCulate1:DATA? FDAT'), dtype='<f8')  # Complete trace
+            # Now write frequency and magnitude of all points with one call
+            if append_mode:
+                np.savetxt(logfile, np.column_stack((np.full(len(freq), timestamp), freq, trace)),
+                           fmt=('%.3f', '%.10g', '%.10g'), delimiter=';')
+            else:
+                np.savetxt(logfile, np.column_stack((freq, trace)), fmt='%.10g', delimiter=';')
 
 
 # -------------------------------------------------------------------------
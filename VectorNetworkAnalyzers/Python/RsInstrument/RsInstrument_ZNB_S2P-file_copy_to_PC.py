@@ -4,12 +4,18 @@
 Created 2021/05
 
 Author:                     Jahns_P
-Version Number:             1
-Date of last change:        2021/06/01
+Version Number:             2
+Date of last change:        2026/10/18
 Requires:                   R&S ZNB, FW 3.12 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
 
-Description:    Example for remote calibration with robot support to feed the calibration elements.
+Description:    Example for saving the S-parameters of a 2-port measurement into a s2p file on the PC.
+                With host_touchstone = False, the s2p file is stored on the instrument and copied to the PC.
+                With host_touchstone = True, all four S-parameters are read with one binary transfer
+                (CALCulate1:DATA:SGRoup?) and the Touchstone file (version 1 or 2) is written on the PC.
+                The files are written by a background writer pool, so the sweep for the next DUT
+                starts immediately. With run_benchmark = True, benchmark() compares both ways for a number of DUTs.
 
 
 General Information:
@@ -24,12 +30,19 @@ https://rsinstrument.readthedocs.io/en/latest/
 """
 
 from RsInstrument import *
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time
+import numpy as np
 
 # Define variables
 resource = 'TCPIP0::10.205.0.172::INSTR'                                                  # VISA resource string for the device
 s2p_filename = r'C:\Users\Public\Documents\Rohde-Schwarz\Vna\Traces\s2pfile.s2p'          # Name and path of the s2p file on the instrument
 pc_filename = r'C:\Tempdata\pcs2pfile.s2p'                                                # Name and path of the s2p file on the PC
+host_touchstone = True                                                                    # True: read the data and write the s2p file on the PC
+touchstone_version = 1                                                                    # Touchstone file format version 1 or 2
+writer_threads = 2                                                                        # Number of background threads writing the files
+run_benchmark = False                                                                     # True: also compare both ways, measures 2 x dut_count extra sweeps
+dut_count = 10                                                                            # Number of DUTs measured in the benchmark
 
 
 # Make sure you have the last version of the RsInstrument
@@ -138,6 +151,77 @@ def fileget():
     Instrument.read_file_from_instrument_to_pc(s2p_filename, pc_filename)
 
 
+def sgroup_setup():
+    """Defines the S-parameter group of ports 1 and 2 and the binary data format"""
+    Instrument.write_str_with_opc('CALCulate1:PARameter:DEFine:SGRoup 1, 2')                        # S11, S12, S21, S22 in one group
+    Instrument.write_str_with_opc('FORMat:DATA REAL,64;:FORMat:BORDer SWAPped')                     # Binary data, little endian
+
+
+def read_sparameters():
+    """Reads the frequencies and the complex S-parameter matrix (points x 2 x 2) with two binary transfers"""
+    freq = np.frombuffer(Instrument.query_bin_block('CALCulate1:DATA:STIMulus?'), dtype='<f8')
+    data = np.frombuffer(Instrument.query_bin_block('CALCulate1:DATA:SGRoup? SDATa'), dtype='<f8')
+    # Interleaved real and imaginary values, the S-parameters S11, S12, S21, S22 one after the other
+    sparams = data.view(np.complex128).reshape(2, 2, len(freq))
+    return freq, sparams.transpose(2, 0, 1)
+
+
+def write_touchstone(filename, freq, sparams, version=1):
+    """Writes the S-parameters as Touchstone file with real and imaginary values.
+    The lines are streamed to the file in blocks, the order of each line is S11, S21, S12, S22."""
+    with open(filename, 'w') as file:
+        file.write('! Created with RsInstrument\n')
+        if version == 2:
+            file.write('[Version] 2.0\n# HZ S RI R 50\n[Number of Ports] 2\n[Two-Port Data Order] 21_12\n'
+                       f'[Number of Frequencies] {len(freq)}\n[Network Data]\n')
+        else:
+            file.write('# HZ S RI R 50\n')
+        columns = [sparams[:, 0, 0], sparams[:, 1, 0], sparams[:, 0, 1], sparams[:, 1, 1]]
+        table = np.column_stack([freq] + [part for s in columns for part in (s.real, s.imag)])
+        for first in range(0, len(table), 1000):
+            np.savetxt(file, table[first:first + 1000], fmt='%.12g', delimiter=' ')
+        if version == 2:
+            file.write('[End]\n')
+
+
+def dut_filename(dut):
+    """Returns the s2p file name on the PC for the DUT number"""
+    return pc_filename.replace('.s2p', f'_{dut}.s2p')
+
+
+def measure_host_touchstone(duts, writer_pool):
+    """Measures the DUTs and hands the Touchstone files to the writer pool, returns the time"""
+    start = time()
+    jobs = []
+    for dut in range(duts):
+        measure()
+        freq, sparams = read_sparameters()
+        jobs.append(writer_pool.submit(write_touchstone, dut_filename(dut), freq, sparams, touchstone_version))
+    for job in jobs:
+        job.result()  # Wait for the files and raise the write errors, if any
+    return time() - start
+
+
+def measure_file_copy(duts):
+    """Measures the DUTs the previous way with a s2p file stored on the instrument, returns the time"""
+    start = time()
+    for dut in range(duts):
+        measure()
+        saves2p()
+        Instrument.read_file_from_instrument_to_pc(s2p_filename, dut_filename(dut))
+        Instrument.write_str_with_opc(f'MMEMory:DELete "{s2p_filename}"')
+    return time() - start
+
+
+def benchmark():
+    """Compares the instrument file copy with the host Touchstone generation"""
+    copy_time = measure_file_copy(dut_count)
+    with ThreadPoolExecutor(max_workers=writer_threads) as writer_pool:
+        host_time = measure_host_touchstone(dut_count, writer_pool)
+    print(f'{dut_count} DUTs, file copy: {copy_time:.2f} s ({copy_time / dut_count * 1000:.0f} ms per DUT), '
+          f'host Touchstone: {host_time:.2f} s ({host_time / dut_count * 1000:.0f} ms per DUT)')
+
+
 # ---------------------------
 # Main Program begins here
 # just calling the functions
@@ -146,9 +230,17 @@ def fileget():
 comprep()
 comcheck()
 meassetup()
-measure()
-saves2p()
-fileget()
+if host_touchstone:
+    sgroup_setup()
+    measure()
+    frequencies, s_matrix = read_sparameters()
+    write_touchstone(pc_filename, frequencies, s_matrix, touchstone_version)
+    if run_benchmark:
+        benchmark()
+else:
+    measure()
+    saves2p()
+    fileget()
 close()
 
 print('I am done')
@@ -4,12 +4,15 @@
 Created 2021/11
 
 Author:                     Jahns_P
-Version Number:             1
-Date of last change:        2021/11/18
+Version Number:             2
+Date of last change:        2026/10/18
 Requires:                   R&S ZNB, FW 3.12 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
 
 Description:    Example for ZNx segmented sweep performed on two channels (two segments each), read out marker and trace results
+                The segments of every channel are defined as a SegmentTable. The table is validated on the PC
+                and only the segment parameters which differ from the table running on the instrument are sent,
+                all of them in one SCPI message per channel.
 
 
 General Information:
@@ -22,10 +25,17 @@ compiled with care. However, errors can not be ruled out.
 
 from RsInstrument import *
 from time import sleep
+from typing import NamedTuple
 
 # Define variables
 resource = 'TCPIP0::10.205.0.51::INSTR'                                                                 # VISA resource string for the device
 
+# Segment tables per channel: start / Hz, stop / Hz, points, power / dBm, bandwidth / Hz
+segment_tables = {1: [(500e6, 900e6, 401, 10, 500),
+                      (1200e6, 2400e6, 101, 0, 1000)],
+                  2: [(100e6, 500e6, 401, 10, 500),
+                      (2000e6, 2100e6, 501, 0, 1000)]}
+
 # Make sure you have the last version of the RsInstrument
 RsInstrument.assert_minimum_version('1.53.0')
 
@@ -45,6 +55,88 @@ supported by the driver and eventually throws an exception.
 """
 
 
+class Segment(NamedTuple):
+    """One sweep segment, frequencies and bandwidth in Hz, power in dBm"""
+    start: float
+    stop: float
+    points: int
+    power: float
+    bandwidth: float
+
+
+class SegmentTable:
+    """Segment table of one channel. The table is validated on the PC, compared with the segments
+    running on the instrument, and only the changed segment parameters are sent in one SCPI message."""
+
+    # SCPI node and Segment field of the segment parameters
+    parameters = [('FREQuency:STARt', 'start'),
+                  ('FREQuency:STOP', 'stop'),
+                  ('SWEep:POINts', 'points'),
+                  ('POWer:LEVel', 'power'),
+                  ('BWIDth', 'bandwidth')]
+
+    def __init__(self, channel, segments):
+        self.channel = channel
+        self.segments = [Segment(*segment) for segment in segments]
+
+    def validate(self, max_points=100001):
+        """Check the table before anything is sent to the instrument"""
+        for number, seg in enumerate(self.segments, 1):
+            if seg.start > seg.stop:
+                raise ValueError(f'CH{self.channel} segment {number}: start {seg.start} Hz is above stop {seg.stop} Hz')
+            if seg.points < 1 or (seg.points == 1 and seg.start != seg.stop):
+                raise ValueError(f'CH{self.channel} segment {number}: invalid number of points {seg.points}')
+            if seg.bandwidth <= 0:
+                raise ValueError(f'CH{self.channel} segment {number}: invalid bandwidth {seg.bandwidth} Hz')
+        ordered = sorted(self.segments)
+        for previous, seg in zip(ordered, ordered[1:]):
+            if seg.start < previous.stop:
+                raise ValueError(f'CH{self.channel}: segment {previous.start}...{previous.stop} Hz '
+                                 f'overlaps segment {seg.start}...{seg.stop} Hz')
+        total = sum(seg.points for seg in self.segments)
+        if total > max_points:
+            raise ValueError(f'CH{self.channel}: {total} sweep points, maximum is {max_points}')
+
+    def read(self, instr):
+        """Read the segment table running on the instrument with one query"""
+        count = instr.query_int(f'SENSe{self.channel}:SEGMent:COUNt?')
+        if count == 0:
+            return []
+        query = ';:'.join(f'SENSe{self.channel}:SEGMent{n}:{node}?'
+                          for n in range(1, count + 1) for node, _ in self.parameters)
+        values = [float(x) for x in instr.query_str(query).split(';')]
+        width = len(self.parameters)
+        return [Segment(v[0], v[1], int(v[2]), v[3], v[4]) for v in
+                (values[i:i + width] for i in range(0, len(values), width))]
+
+    def commands(self, current):
+        """Return the SCPI commands that turn the current table into this table"""
+        # Delete the segments which are not in the table anymore first, the highest number first
+        commands = [f'SENSe{self.channel}:SEGMent{number}:DELete'
+                    for number in range(len(current), len(self.segments), -1)]
+        for number, seg in enumerate(self.segments, 1):
+            old = current[number - 1] if number <= len(current) else None
+            if old is None:
+                commands.append(f'SENSe{self.channel}:SEGMent{number}:ADD')
+            parameters = self.parameters
+            if old is not None and seg.start > old.stop:
+                parameters = [parameters[1], parameters[0]] + parameters[2:]  # Move the stop frequency up first
+            for node, field in parameters:
+                value = getattr(seg, field)
+                if old is None or abs(getattr(old, field) - value) > 1e-9 * max(abs(value), 1):
+                    commands.append(f'SENSe{self.channel}:SEGMent{number}:{node} {value}')
+        return commands
+
+    def upload(self, instr):
+        """Validate the table and send the differences to the instrument, return the number of commands"""
+        self.validate()
+        commands = self.commands(self.read(instr))
+        if commands:
+            instr.write_str(';:'.join(commands))
+            instr.query_opc()
+        return len(commands)
+
+
 def comprep():
     """Preparation of the communication (termination, etc...)"""
 
@@ -83,34 +175,10 @@ def meassetup():
     Instrument.write_str_with_opc("SENSe:SWEep:TIME:AUTO ON")                                              # Auto Sweep time
     Instrument.write_str_with_opc("TRIGger:SEQuence:SOURce IMMediate")                                     # Trigger immediate (Auto)
     Instrument.write_str_with_opc("AVERage OFF")                                                           # Averaging disabled
-    Instrument.write_str_with_opc("SENSe1:SEGment:CLEar")                                                  # Deletes all sweep segments in the channel
-
-    #
-    # Define Segment 1 for CH1
-    #
-
     # Ch1 Trc1 already exists by default
     Instrument.write_str_with_opc("CALCULATE1:PARAMETER:SDEFINE 'Trc1', 'S22'")                             # Reconfigure the trace Trc1 to S22
     Instrument.write_str_with_opc("DISPLAY:WINDOW1:TRACE:EFEED 'Trc1'")                                     # Feed it again to the window
 
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:ADD")                                                   # Add Segment 1
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:FREQuency:STARt 500MHz")                                # Start Frequency
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:FREQuency:STOP 900MHz")                                 # Stop Frequency
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:SWEep:POINts 401")                                      # No of Sweep Points
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:POWer:LEVel 10")                                        # Output Power Level
-    Instrument.write_str_with_opc("SENSe1:SEGMent1:BWIDth 500Hz")                                          # RBW
-
-    #
-    # Define Segment 2 for CH1
-    #
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:ADD")                                                   # Add Segment 2
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:FREQuency:STARt 1200MHz")                               # Start Frequency
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:FREQuency:STOP 2400MHz")                                # Stop Frequency
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:SWEep:POINts 101")                                      # No of Sweep Points
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:POWer:LEVel 0")                                         # Output Power Level
-    Instrument.write_str_with_opc("SENSe1:SEGMent2:BWIDth 1000Hz")                                         # RBW
-
     #
     # Prepare CH2 and trace 2
     #
@@ -120,32 +188,14 @@ def meassetup():
     Instrument.write_str_with_opc("DISPLAY:WINDOW2:STATE ON")
     Instrument.write_str_with_opc("DISPLAY:WINDOW2:TRACE1:FEED 'Trc2'")
 
-    Instrument.write_str_with_opc("SENSe2:SEGment:CLEar")                                                   # Deletes all sweep segments in CH2
-                                                                                                            # This command is very important as all the segemnts defined before for CH1
-    #
-    # Define Segment 1 for CH2
-    #
-
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:ADD")                                                    # Add Segment 1
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:FREQuency:STARt 100MHz")                                 # Start Frequency
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:FREQuency:STOP 500MHz")                                  # Stop Frequency
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:SWEep:POINts 401")                                       # No of Sweep Points
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:POWer:LEVel 10")                                         # Output Power Level
-    Instrument.write_str_with_opc("SENSe2:SEGMent1:BWIDth 500Hz")                                           # RBW
-
     #
-    # Define Segment 2 for CH2
+    # Define the segments for CH1 and CH2
     #
-
-    # Using the complete command including "SENSe" will define the channel the changes will be associated to
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:ADD")                                                    # Add Segment 2
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:FREQuency:STARt 2000MHz")                                # Start Frequency
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:FREQuency:STOP 2100MHz")                                 # Stop Frequency
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:SWEep:POINts 501")                                       # No of Sweep Points
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:POWer:LEVel 0")                                          # Output Power Level
-    Instrument.write_str_with_opc("SENSe2:SEGMent2:BWIDth 1000Hz")                                          # RBW
-
+    # Every channel has its own segment table. Segments not in the table are deleted,
+    # unchanged segments are not sent again
+    for channel, segments in segment_tables.items():
+        sent = SegmentTable(channel, segments).upload(Instrument)
+        print(f'CH{channel} segment table: {sent} commands sent')
 
 def measure():
     """ Initiate sweep and capture measurement data including some marker values"""
@@ -0,0 +1,243 @@
+"""
+# GitHub examples repository path: VectorNetworkAnalyzers/Python/RsInstrument
+
+Created 2026/10
+
+Author:                     R&S Customer Support
+Version Number:             2
+Date of last change:        2026/10/18
+Requires:                   R&S ZNB/ZNA, FW 3.12 or newer and adequate options
+                            Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
+                            Python 3.9 or newer
+
+Description:    Example for running the same measurement plan on several VNAs at the same time from one script.
+                Every VNA has its own RsInstrument session and its own job queue. The blocking session calls
+                run in worker threads, scheduled by asyncio. One plan consists of
+                setup (all commands in one SCPI message), sweep, binary readout and save.
+                The results are handed to one writer through a queue of limited size: if the writer falls behind,
+                the VNAs wait before the next sweep (back-pressure) instead of filling up the memory.
+                If the writer fails, the VNA workers are stopped instead of waiting for the full queue forever.
+                The stimulus values are saved once per VNA, every sweep file only holds the traces.
+                At the end, the sweeps/s rate per VNA and for the whole fleet is printed.
+                The plans are ported from RsInstrument_ZNB_S21_Magnitude_write_to_csv.py and
+                RsInstrument_ZNB_Segmented_Sweep_2channels.py.
+
+
+General Information:
+
+Please always check this example script for unsuitable setting that may
+destroy your DUT before connecting it to the instrument!
+This example does not claim to be complete. All information has been
+compiled with care. However, errors can not be ruled out.
+"""
+
+from RsInstrument import *
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import numpy as np
+import os
+import time
+
+# Define variables
+resources = ['TCPIP0::10.205.0.51::hislip0',
+             'TCPIP0::10.205.0.52::hislip0',
+             'TCPIP0::10.205.0.53::hislip0']                                                    # VISA resource strings of the VNAs
+plan_name = 'S21'                                                                               # Measurement plan, 'S21' or 'Segmented'
+sweeps_per_vna = 100                                                                            # Number of sweeps on every VNA
+writer_queue_size = 16                                                                          # Results waiting for the writer, before the VNAs have to wait
+output_folder = r'c:\tempdata\fleet'                                                            # Folder for the result files
+
+# Make sure you have the last version of the RsInstrument
+RsInstrument.assert_minimum_version('1.53.0')
+
+
+class MeasurementPlan:
+    """Setup commands and trace queries of a measurement, the same for every VNA"""
+
+    def __init__(self, name, setup_commands, traces):
+        self.name = name
+        self.setup_commands = setup_commands
+        self.traces = traces  # List of (channel, trace query, complex values)
+        self.stimulus = {}
+
+    def setup(self, instr):
+        """Send all setup commands in one message and synchronize once, little endian binary data"""
+        instr.write_str(';:'.join(self.setup_commands))
+        instr.query_opc()
+        # The stimulus values do not change from sweep to sweep, read them once with full resolution
+        instr.write_str('FORMat:DATA REAL,64')
+        for ch, _, _ in self.traces:
+            self.stimulus[ch] = np.frombuffer(instr.query_bin_block(f'CALCulate{ch}:DATA:STIMulus?'), dtype='<f8')
+        instr.write_str('FORMat:DATA REAL,32')
+
+    def measure(self, instr):
+        """Perform one sweep on all channels and read the traces in binary format.
+        Returns a dictionary {channel: trace}"""
+        instr.write_str_with_opc('INITiate:IMMediate:ALL')
+        result = {}
+        for ch, query, is_complex in self.traces:
+            data = np.frombuffer(instr.query_bin_block(query), dtype='<f4')
+            result[ch] = data.view(np.complex64) if is_complex else data
+        return result
+
+
+# Port of meas_setup() in RsInstrument_ZNB_S21_Magnitude_write_to_csv.py
+S21_PLAN = MeasurementPlan('S21',
+                           ['SENSe1:FREQuency:STARt 0.01GHZ',
+                            'SENSe1:FREQuency:STOP 1.0GHZ',
+                            'SENSe1:SWEep:POINts 401',
+                            'CALCulate1:PARameter:MEASure "Trc1", "S21"',
+                            'DISPlay:WINDow1:TRACe1:Y:SCALe:AUTO ONCE',
+                            'INITiate1:CONTinuous OFF',
+                            'FORMat:BORDer SWAPped'],
+                           [(1, 'CALCulate1:DATA? FDAT', False)])
+
+
+def segment_commands(channel, segments):
+    """Commands for the segments of the channel: (start, stop, points, power, bandwidth)"""
+    commands = [f'SENSe{channel}:SEGMent:CLEar']
+    for number, (start, stop, points, power, bandwidth) in enumerate(segments, 1):
+        commands += [f'SENSe{channel}:SEGMent{number}:ADD',
+                     f'SENSe{channel}:SEGMent{number}:FREQuency:STARt {start}',
+                     f'SENSe{channel}:SEGMent{number}:FREQuency:STOP {stop}',
+                     f'SENSe{channel}:SEGMent{number}:SWEep:POINts {points}',
+                     f'SENSe{channel}:SEGMent{number}:POWer:LEVel {power}',
+                     f'SENSe{channel}:SEGMent{number}:BWIDth {bandwidth}']
+    return commands + [f'SENSe{channel}:SWEep:TYPE SEGMent']
+
+
+# Port of meassetup() / measure() in RsInstrument_ZNB_Segmented_Sweep_2channels.py
+SEGMENTED_PLAN = MeasurementPlan('Segmented',
+                                 ['INITiate:CONTinuous OFF',
+                                  'SENSe:SWEep:TIME:AUTO ON',
+                                  'TRIGger:SEQuence:SOURce IMMediate',
+                                  'AVERage OFF',
+                                  "CALCULATE1:PARAMETER:SDEFINE 'Trc1', 'S22'",
+                                  "DISPLAY:WINDOW1:TRACE:EFEED 'Trc1'",
+                                  "CALCULATE2:PARAMETER:SDEFINE 'Trc2', 'S22'",
+                                  "DISPLAY:WINDOW2:STATE ON",
+                                  "DISPLAY:WINDOW2:TRACE1:FEED 'Trc2'"]
+                                 + segment_commands(1, [(500e6, 900e6, 401, 10, 500), (1200e6, 2400e6, 101, 0, 1000)])
+                                 + segment_commands(2, [(100e6, 500e6, 401, 10, 500), (2000e6, 2100e6, 501, 0, 1000)])
+                                 + ['FORMat:BORDer SWAPped'],
+                                 [(1, 'CALCulate1:DATA? SDATa', True),
+                                  (2, 'CALCulate2:DATA? SDATa', True)])
+
+PLANS = {plan.name: plan for plan in (S21_PLAN, SEGMENTED_PLAN)}
+
+
+def open_session(resource):
+    """Open and prepare the session to one VNA"""
+    instr = RsInstrument(resource, id_query=True, reset=True,
+                         options="SelectVisa='rs' , LoggingMode = Off, LoggingToConsole = False")
+    instr.visa_timeout = 5000  # Timeout for VISA Read Operations
+    instr.opc_timeout = 20000  # Timeout for opc-synchronised operations
+    instr.instrument_status_checking = True  # Error check after each command, can be True or False
+    instr.clear_status()  # Clear status register
+    return instr
+
+
+def save_stimulus(name, stimulus):
+    """Save the stimulus values of all channels once per VNA"""
+    np.savez(os.path.join(output_folder, f'{name}_stimulus.npz'), **{f'ch{ch}': values for ch, values in stimulus.items()})
+
+
+def save_result(name, sweep, traces):
+    """Save the traces of one sweep into a numpy file"""
+    np.savez(os.path.join(output_folder, f'{name}_sweep{sweep:05d}.npz'), **{f'ch{ch}': trace for ch, trace in traces.items()})
+
+
+async def vna_worker(resource, plan, jobs, writer_queue, stats):
+    """Run the plan on one VNA for every job of its queue"""
+    # Every VNA has its own plan copy, the stimulus is different if the instruments differ
+    plan = MeasurementPlan(plan.name, plan.setup_commands, plan.traces)
+    name = resource.split('::')[1].replace('.', '_')
+    instr = await asyncio.to_thread(open_session, resource)
+    try:
+        print(f'{name}: {instr.idn_string}')
+        await asyncio.to_thread(plan.setup, instr)
+        await asyncio.to_thread(save_stimulus, name, plan.stimulus)
+        start = time.time()
+        while True:
+            sweep = await jobs.get()
+            if sweep is None:
+                break
+            traces = await asyncio.to_thread(plan.measure, instr)
+            stats[resource]['sweeps'] += 1
+            stats[resource]['bytes'] += sum(trace.nbytes for trace in traces.values())
+            # Waits here if the writer is behind
+            await writer_queue.put((name, sweep, traces))
+        stats[resource]['time'] = time.time() - start
+    finally:
+        await asyncio.to_thread(instr.close)
+
+
+async def writer(writer_queue, stats):
+    """Save the results of all VNAs, one after the other"""
+    while True:
+        item = await writer_queue.get()
+        if item is None:
+            break
+        stats['max_queue'] = max(stats['max_queue'], writer_queue.qsize() + 1)
+        await asyncio.to_thread(save_result, *item)
+        stats['written'] += 1
+
+
+async def run_fleet(plan):
+    # One thread per VNA plus one for the writer
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=len(resources) + 1))
+    writer_queue = asyncio.Queue(maxsize=writer_queue_size)
+    stats = {resource: {'sweeps': 0, 'bytes': 0, 'time': 0} for resource in resources}
+    writer_stats = {'written': 0, 'max_queue': 0}
+    # Per-VNA job queue, here simply the sweep numbers
+    queues = {}
+    for resource in resources:
+        queues[resource] = asyncio.Queue()
+        for sweep in range(sweeps_per_vna):
+            queues[resource].put_nowait(sweep)
+        queues[resource].put_nowait(None)
+
+    start = time.time()
+    writer_task = asyncio.create_task(writer(writer_queue, writer_stats))
+    workers = asyncio.gather(*(vna_worker(resource, plan, queues[resource], writer_queue, stats)
+                               for resource in resources), return_exceptions=True)
+    # If the writer fails, nobody empties the queue and the workers would wait forever: stop them
+    await asyncio.wait([writer_task, workers], return_when=asyncio.FIRST_COMPLETED)
+    if writer_task.done():
+        workers.cancel()
+        try:
+            await workers
+        except asyncio.CancelledError:
+            pass
+        results = [asyncio.CancelledError('writer stopped')] * len(resources)
+        if writer_task.exception() is not None:
+            print(f'Writer failed - {writer_task.exception()!r}')
+    else:
+        results = workers.result()
+        await writer_queue.put(None)
+        await writer_task
+    elapsed = time.time() - start
+
+    for resource, result in zip(resources, results):
+        vna_stats = stats[resource]
+        if isinstance(result, BaseException):
+            print(f'{resource}: failed after {vna_stats["sweeps"]} sweeps - {result}')
+        elif vna_stats['time'] > 0:
+            print(f'{resource}: {vna_stats["sweeps"]} sweeps, {vna_stats["sweeps"] / vna_stats["time"]:.1f} sweeps/s')
+    total_sweeps = sum(vna_stats['sweeps'] for vna_stats in stats.values())
+    total_bytes = sum(vna_stats['bytes'] for vna_stats in stats.values())
+    print(f'Fleet: {total_sweeps} sweeps in {elapsed:.1f} s -> {total_sweeps / elapsed:.1f} sweeps/s, '
+          f'{total_bytes / elapsed / 1e6:.2f} MB/s, {writer_stats["written"]} files written, '
+          f'writer queue maximum {writer_stats["max_queue"]} of {writer_queue_size}')
+
+
+# ---------------------------
+# Main Program begins here
+# just calling the functions
+# ---------------------------
+
+os.makedirs(output_folder, exist_ok=True)
+asyncio.run(run_fleet(PLANS[plan_name]))
+
+print("I'm done")
@@ -0,0 +1,162 @@
+"""
+# GitHub examples repository path: VectorNetworkAnalyzers/Python/RsInstrument
+
+Created 2026/10
+
+Author:                     R&S Customer Support
+Version Number:             2
+Date of last change:        2026/10/18
+Requires:                   R&S ZNB/ZNA, FW 3.12 or newer and adequate options
+                            Installed VISA e.g. R&S Visa 5.12.x or newer
+                            Installed numpy Python module
+
+Description:    Example for reading all traces of several channels plus marker results with a minimum of
+                round trips. Instead of selecting every trace (CALC:PAR:SEL) and reading it separately,
+                all traces of a channel are read with one binary transfer (CALCulate<Ch>:DATA:CALL? SDATa).
+                The S-parameters of the columns are taken from CALCulate<Ch>:DATA:CALL:CATalog? and mapped
+                to the trace names of CALCulate<Ch>:PARameter:CATalog?, both cached.
+                The marker searches (minimum, maximum) are executed after every sweep with one message, then
+                all marker X/Y values of all channels are read with one concatenated query.
+                read_traces() returns a dictionary {trace name: complex numpy array}.
+
+
+General Information:
+
+Please always check this example script for unsuitable setting that may
+destroy your DUT befor connecting it to the instrument!
+This example does not claim to be complete. All information has been
+compiled with care. However, errors can not be ruled out.
+"""
+
+from RsInstrument import *
+import numpy as np
+from time import time
+
+# Define variables
+resource = 'TCPIP0::10.205.0.51::INSTR'                                                                 # VISA resource string for the device
+channels = [1, 2]                                                                                       # Channels to be read
+markers = [1, 2, 3]                                                                                     # Markers to be read in every channel
+marker_searches = {1: 'MINimum', 2: 'MAXimum'}                                                          # Search function of the markers, executed after every sweep
+
+# Make sure you have the last version of the RsInstrument
+RsInstrument.assert_minimum_version('1.53.0')
+
+# Define the device handle
+Instrument = RsInstrument(resource, True, True, "SelectVisa='rs'")
+
+# Cache of the trace names per channel, to be cleared if the trace configuration changes
+trace_catalog = {}
+
+
+def comprep():
+    """Preparation of the communication (termination, etc...)"""
+
+    print(f'VISA Manufacturer: {Instrument.visa_manufacturer}')                                         # Confirm VISA package to be chosen
+    Instrument.visa_timeout = 5000                                                                      # Timeout for VISA Read Operations
+    Instrument.opc_timeout = 5000                                                                       # Timeout for opc-synchronised operations
+    Instrument.instrument_status_checking = True                                                        # Error check after each command, can be True or False
+    Instrument.clear_status()                                                                           # Clear status register
+
+
+def close():
+    """Close the VISA session"""
+
+    Instrument.close()
+
+
+def meassetup():
+    """Prepare two channels with two traces each and three markers per channel"""
+
+    Instrument.write_str_with_opc("SYSTEM:DISPLAY:UPDATE ON")                                           # Be sure to have the display updated whilst remote control
+    Instrument.write_str_with_opc("INIT:CONT OFF")                                                      # Set single sweep mode
+    Instrument.write_str("CALCULATE1:PARAMETER:SDEFINE 'Trc1', 'S11';"
+                         ":CALCULATE1:PARAMETER:SDEFINE 'Trc2', 'S21';"
+                         ":CALCULATE2:PARAMETER:SDEFINE 'Trc3', 'S12';"
+                         ":CALCULATE2:PARAMETER:SDEFINE 'Trc4', 'S22'")
+    Instrument.write_str("DISPLAY:WINDOW1:TRACE1:FEED 'Trc1';:DISPLAY:WINDOW1:TRACE2:FEED 'Trc2';"
+                         ":DISPLAY:WINDOW2:STATE ON;"
+                         ":DISPLAY:WINDOW2:TRACE1:FEED 'Trc3';:DISPLAY:WINDOW2:TRACE2:FEED 'Trc4'")
+    for ch in channels:
+        Instrument.write_str(f"CALCulate{ch}:MARKer1:STATe ON;:CALCulate{ch}:MARKer2:STATe ON;"
+                             f":CALCulate{ch}:MARKer3:STATe ON;:CALCulate{ch}:MARKer3:X 2 GHz")
+    Instrument.write_str("FORMat:DATA REAL,32;:FORMat:BORDer SWAPped")                                 # Binary data, little endian
+    Instrument.query_opc()
+
+
+def get_trace_names(channel):
+    """Return the trace names for the columns of CALCulate<Ch>:DATA:CALL?, cached per channel.
+    CALL:CATalog? lists the S-parameter of every column, PARameter:CATalog? the pairs of trace name
+    and S-parameter. Every column gets the names of the traces measuring its S-parameter."""
+
+    if channel not in trace_catalog:
+        columns = Instrument.query_str(f"CALCulate{channel}:DATA:CALL:CATalog?").strip("'\"").split(',')
+        pairs = Instrument.query_str(f"CALCulate{channel}:PARameter:CATalog?").strip("'\"").split(',')
+        columns, pairs = [x.strip() for x in columns], [x.strip() for x in pairs]
+        traces = {}
+        for name, parameter in zip(pairs[0::2], pairs[1::2]):
+            traces.setdefault(parameter.upper(), []).append(name)
+        trace_catalog[channel] = [traces.get(parameter.upper(), []) for parameter in columns]
+    return trace_catalog[channel]
+
+
+def read_traces(channel_list):
+    """Read the SDATa of all traces of the channels, one binary transfer per channel.
+    Returns a dictionary {trace name: complex64 numpy array}"""
+
+    result = {}
+    for ch in channel_list:
+        columns = get_trace_names(ch)
+        data = np.frombuffer(Instrument.query_bin_block(f"CALCulate{ch}:DATA:CALL? SDATa"), dtype='<f4')
+        # Interleaved real and imaginary values, the columns of the channel one after the other
+        values = data.view(np.complex64).reshape(len(columns), -1)
+        for names, trace in zip(columns, values):
+            for name in names:
+                result[name] = trace
+    return result
+
+
+def execute_marker_searches(channel_list):
+    """Execute the marker searches on the trace data of the last sweep, one message for all channels"""
+
+    Instrument.write_str(';'.join(f":CALCulate{ch}:MARKer{mk}:FUNCtion:EXECute {function}"
+                                  for ch in channel_list for mk, function in marker_searches.items()))
+    Instrument.query_opc()
+
+
+def read_markers(channel_list, marker_list):
+    """Read X and Y of all markers with one query. Returns a dictionary {(channel, marker): (x, y)}"""
+
+    keys = [(ch, mk) for ch in channel_list for mk in marker_list]
+    query = ';'.join(f":CALCulate{ch}:MARKer{mk}:X?;:CALCulate{ch}:MARKer{mk}:Y?" for ch, mk in keys)
+    values = [float(x) for x in Instrument.query_str(query).split(';')]
+    return {key: (values[2 * i], values[2 * i + 1]) for i, key in enumerate(keys)}
+
+
+def measure():
+    """Initiate sweep and capture all trace data and marker values"""
+
+    Instrument.write_str_with_opc("INIT:IMMediate:ALL")                                                # Initiate trigger to all channels
+    start = time()
+    traces = read_traces(channels)
+    execute_marker_searches(channels)                                                                   # The searches of the setup ran before any sweep
+    marker_values = read_markers(channels, markers)
+    print(f'Readout of {len(traces)} traces and {len(marker_values)} markers in {time() - start:.3f} s')
+
+    for name, trace in traces.items():
+        print(f"{name}: {len(trace)} points, max |S| = {20 * np.log10(np.abs(trace).max()):0.3f} dB")
+    for (ch, mk), (x, y) in marker_values.items():
+        print(f"CH{ch} Marker {mk}: {x / 1e6:0.3f} MHz, {y:0.3f} dB")
+
+# ---------------------------
+#  Main Program begins here
+#  just calling the functions
+# ---------------------------
+
+
+comprep()
+meassetup()
+measure()
+close()
+
+
+print("I'm done")
@@ -4,8 +4,8 @@
 Created 2021/11
 
 Author:                     Winfried Jansen
-Version Number:             1
-Date of last change:        2021/11/15
+Version Number:             2
+Date of last change:        2026/10/18
 Requires:                   R&S ZNB, FW 3.12 or newer and adequate options
                             Installed VISA e.g. R&S Visa 5.12.x or newer
 
@@ -17,7 +17,9 @@ Description:    Example how to:
 - transfer the setup from the PC to the instrument
 - Apply the setup
 - The result is the same state of the instrument as at the beginning of the example
-
+- Keep the setups in a SetupLibrary on the PC. The setups are stored by their content hash (SHA-256)
+  together with the instrument model and firmware. For every instrument, the library records which setups
+  are already on its disk, so a recall is a single MMEM:LOAD:STAT and the file is only transferred when needed.
 
 
 General Information:
@@ -30,7 +32,12 @@ compiled with care. However, errors can not be ruled out.
 
 
 from RsInstrument import *
-from time import sleep
+from datetime import datetime
+from time import sleep, time
+import hashlib
+import json
+import os
+import shutil
 
 # Define fixed values
 # VISA resource string for the device
@@ -38,6 +45,9 @@ resource = 'TCPIP0::10.112.0.225::HISLIP'
 # PC File Path
 pc_file = r'c:\temp\setup_on_pc.znx'
 instrument_file = r'c:\Users\Public\Documents\Rohde-Schwarz\VNA\RecallSets\setup_on_instr.znx'
+# Setup library on the PC and folder for the library setups on the instrument
+library_folder = os.path.join(os.path.expanduser('~'), 'RsInstrument_ZNx_setup_library')
+instrument_library_folder = r'c:\Users\Public\Documents\Rohde-Schwarz\VNA\RecallSets'
 
 # Define the device handle
 # Instrument = RsInstrument(resource)
@@ -84,6 +94,98 @@ def comcheck():
     print('Hello, I am ' + idnResponse)
 
 
+def file_hash(path):
+    """SHA-256 of the file content"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class SetupLibrary:
+    """Setup files on the PC, stored by content hash, with the record of the setups on every instrument.
+    The index is kept in index.json of the library folder."""
+
+    def __init__(self, instr, folder):
+        self.instr = instr
+        self.folder = folder
+        self.key = f'{instr.full_instrument_model_name} {instr.instrument_serial_number}'
+        os.makedirs(folder, exist_ok=True)
+        self.index_file = os.path.join(folder, 'index.json')
+        self.index = {'setups': {}, 'instruments': {}}
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as file:
+                self.index = json.load(file)
+        # Hashes of the setups on the disk of this instrument
+        self.on_instrument = self.index['instruments'].setdefault(self.key, {})
+
+    def save_index(self):
+        with open(self.index_file, 'w') as file:
+            json.dump(self.index, file, indent=2)
+
+    @staticmethod
+    def instrument_path(content_hash):
+        return f'{instrument_library_folder}\\lib_{content_hash[:16]}.znx'
+
+    def add_file(self, name, pc_path):
+        """Add a setup file of the PC to the library, return its hash"""
+        content_hash = file_hash(pc_path)
+        library_path = os.path.join(self.folder, f'{content_hash}.znx')
+        if not os.path.exists(library_path):
+            shutil.copyfile(pc_path, library_path)
+        self.index['setups'][name] = {'hash': content_hash,
+                                      'model': self.instr.full_instrument_model_name,
+                                      'firmware': self.instr.instrument_firmware_version,
+                                      'date': datetime.now().isoformat(timespec='seconds')}
+        self.save_index()
+        return content_hash
+
+    def store(self, name):
+        """Store the current instrument state under the name. The file stays on the instrument
+        under its hash name, so a later recall does not need a transfer."""
+        self.instr.write_str_with_opc(f'MMEM:STOR:STAT 1,"{instrument_file}"')
+        temp_path = os.path.join(self.folder, 'stored.tmp')
+        self.instr.read_file_from_instrument_to_pc(instrument_file, temp_path)
+        content_hash = self.add_file(name, temp_path)
+        os.remove(temp_path)
+        if content_hash in self.on_instrument:
+            self.instr.write_str_with_opc(f'MMEM:DEL "{instrument_file}"')
+        else:
+            self.instr.write_str_with_opc(f'MMEM:MOVE "{instrument_file}","{self.instrument_path(content_hash)}"')
+            self.on_instrument[content_hash] = self.instrument_path(content_hash)
+            self.save_index()
+        return content_hash
+
+    def recall(self, name, verify=False):
+        """Load the setup on the instrument. The file is only transferred if the instrument does not have it.
+        Without verify, a known file is loaded with one command, the status check after the load reports
+        a file deleted on the instrument. With verify, the existence of the file is checked before.
+        Returns True, if the file was transferred."""
+        entry = self.index['setups'][name]
+        if entry['model'] != self.instr.full_instrument_model_name:
+            raise ValueError(f'Setup {name} was stored on a {entry["model"]}, '
+                             f'this instrument is a {self.instr.full_instrument_model_name}')
+        if entry['firmware'] != self.instr.instrument_firmware_version:
+            print(f'Warning: setup {name} was stored with firmware {entry["firmware"]}, '
+                  f'the instrument has firmware {self.instr.instrument_firmware_version}')
+        content_hash = entry['hash']
+        path = self.on_instrument.get(content_hash)
+        transfer = path is None or (verify and not self.instr.file_exists(path))
+        if transfer:
+            path = self.instrument_path(content_hash)
+            self.instr.send_file_from_pc_to_instrument(os.path.join(self.folder, f'{content_hash}.znx'), path)
+            self.on_instrument[content_hash] = path
+            self.save_index()
+        self.instr.write_str_with_opc(f'MMEM:LOAD:STAT 1,"{path}"')
+        return transfer
+
+    def forget_instrument(self):
+        """Clear the record of this instrument, e.g. after the RecallSets folder was cleaned up"""
+        self.on_instrument.clear()
+        self.save_index()
+
+
 # Main Program begins here
 comprep()
 comcheck()
@@ -106,6 +208,21 @@ input("Press Enter to continue...\n")
 Instrument.send_file_from_pc_to_instrument(pc_file, instrument_file)
 # Load the transferred setup
 Instrument.write_str_with_opc(f'MMEM:LOAD:STAT 1,"{instrument_file}"')
+
+print("Now the same with the setup library: the setup is stored in the library and recalled twice")
+input("Press Enter to continue...\n")
+library = SetupLibrary(Instrument, library_folder)
+setup_hash = library.store('example')
+Instrument.reset()
+start = time()
+transferred = library.recall('example')
+print(f'Recall in {time() - start:.3f} s, file transferred: {transferred}')
+# Simulate another instrument disk state: delete the file, with verify the library finds out and transfers it again
+Instrument.write_str_with_opc(f'MMEM:DEL "{library.instrument_path(setup_hash)}"')
+Instrument.reset()
+start = time()
+transferred = library.recall('example', verify=True)
+print(f'Recall in {time() - start:.3f} s, file transferred: {transferred}')
 close()
 
 print("Now you should see the same state of the instrument as before you started this example")
\ No newline at end of file